@@ -0,0 +1,145 @@
+# Bounded scoring executor with admission control and load shedding
+#
+# All CPU work runs on a dedicated, sized ThreadPoolExecutor instead of
+# Starlette's default threadpool. Before a job is queued we check:
+#   1. queue capacity          -> 429 Too Many Requests when full
+#   2. predicted latency vs SLO -> 503 Service Unavailable if it would be missed
+#      (only while every worker is busy; an idle worker always takes the job)
+# Queued jobs also carry a deadline; a job that hasn't finished by then is
+# cancelled (if it hasn't started yet) and answered with 503.
+# Every rejection carries a Retry-After hint so clients back off instead of
+# piling on while the HPA adds pods.
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code, reason, retry_after):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Scoring capacity exceeded ({reason})")
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_workers,
+        max_queue,
+        deadline_ms,
+        slo_ms,
+        queue_depth_metric=None,
+        shed_metric=None,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.deadline = deadline_ms / 1000.0
+        self.slo = slo_ms / 1000.0
+        self.queue_depth_metric = queue_depth_metric
+        self.shed_metric = shed_metric
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+
+        # Jobs admitted but not finished (queued + running); updated from worker threads too
+        self._pending = 0
+        self._lock = threading.Lock()
+        # EWMA of service time (seconds) per job kind: a 10k-row batch and a
+        # single row have nothing in common, so one average would mislead both
+        self._service_time = {}
+        self._alpha = 0.1
+        # Sum of the estimated service times of jobs admitted but not started yet
+        self._queued_seconds = 0.0
+
+    # -----------------------
+    # ACCOUNTING
+    # -----------------------
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def service_time(self, kind):
+        return self._service_time.get(kind, 0.0)
+
+    def _queued(self):
+        return max(self._pending - self.max_workers, 0)
+
+    def _estimated_wait(self):
+        # Work ahead of us drains max_workers jobs at a time
+        return max(self._queued_seconds, 0.0) / self.max_workers
+
+    def _set_pending(self, delta):
+        with self._lock:
+            self._pending += delta
+            queued = self._queued()
+        if self.queue_depth_metric is not None:
+            self.queue_depth_metric.set(queued)
+
+    def _dequeue(self, job):
+        # Called when the job starts, and again when it finishes (or is cancelled unstarted)
+        with self._lock:
+            self._queued_seconds -= job["estimate"]
+            job["estimate"] = 0.0
+
+    def _finish(self, job):
+        self._dequeue(job)
+        self._set_pending(-1)
+
+    def _shed(self, status_code, reason, kind):
+        if self.shed_metric is not None:
+            self.shed_metric.labels(reason).inc()
+        retry_after = max(1, math.ceil(self._estimated_wait() + self.service_time(kind)))
+        raise Overloaded(status_code, reason, retry_after)
+
+    def _timed(self, fn, args, kind, job):
+        self._dequeue(job)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                previous = self._service_time.get(kind)
+                self._service_time[kind] = elapsed if previous is None else previous + self._alpha * (elapsed - previous)
+
+    # -----------------------
+    # PUBLIC API
+    # -----------------------
+
+    async def run(self, fn, *args, kind="default", enforce_deadline=True):
+        """
+        Run fn(*args) on the scoring executor, or raise Overloaded.
+        `kind` groups jobs of similar cost (single rows, batches, ...) for the
+        latency estimate. enforce_deadline=False waits for the job however long
+        it takes (warm-up: nobody is waiting on it, and it must not be dropped).
+        """
+        if self._queued() >= self.max_queue and self._pending >= self.max_workers:
+            self._shed(429, "queue_full", kind)
+
+        estimate = self.service_time(kind)
+        # With a worker free the job starts right away, so shedding it can't help
+        # the SLO; admitting it also keeps the estimate fed, so it recovers from
+        # one slow outlier instead of shedding everything from then on
+        if self._pending >= self.max_workers and self._estimated_wait() + estimate > self.slo:
+            self._shed(503, "slo", kind)
+
+        job = {"estimate": estimate}
+        with self._lock:
+            self._queued_seconds += estimate
+        self._set_pending(1)
+        future = self.executor.submit(self._timed, fn, args, kind, job)
+        future.add_done_callback(lambda _: self._finish(job))
+
+        try:
+            # Cancelling the wrapper cancels the job too if it hasn't started yet
+            deadline = self.deadline if enforce_deadline else None
+            return await asyncio.wait_for(asyncio.wrap_future(future), deadline)
+        except asyncio.TimeoutError:
+            self._shed(503, "deadline", kind)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,50 @@
+# Loader for the compact serving artifact written by training/training_v1.py
+#
+#   <dir>/coef.npy       float64 (n_features,)  - memory-mapped, not copied
+#   <dir>/intercept.npy  float64 (1,)
+#   <dir>/meta.json      feature_columns, model_version, model_type, classes
+#   <dir>/model.onnx     optional ONNX graph, used when the backend is "onnx"
+#
+# Only needs numpy + json, so the API can start without importing mlflow or
+# unpickling the sklearn model.
+
+import json
+import os
+
+import numpy as np
+
+from api.scoring import SUPPORTED_LINEAR_MODELS, LinearScorer, OnnxScorer
+
+SUPPORTED_FORMAT_VERSIONS = (1,)
+ONNX_FILE = "model.onnx"
+
+
+def load_serving_artifact(path, backend="auto", onnx_threads=1):
+    """Return (scorer, feature_columns, model_version) for a serving artifact directory."""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+
+    if meta.get("format_version") not in SUPPORTED_FORMAT_VERSIONS:
+        raise RuntimeError(f"Unsupported serving artifact format: {meta.get('format_version')}")
+    if meta.get("model_type") not in SUPPORTED_LINEAR_MODELS:
+        raise RuntimeError(f"Serving artifact model type not supported: {meta.get('model_type')}")
+    if len(meta.get("classes", [])) != 2:
+        raise RuntimeError("Serving artifact must be a binary classifier")
+
+    coef = np.load(os.path.join(path, "coef.npy"), mmap_mode="r")
+    intercept = np.load(os.path.join(path, "intercept.npy"))
+
+    feature_columns = list(meta["feature_columns"])
+    if coef.shape != (len(feature_columns),):
+        raise RuntimeError(
+            f"coef shape {coef.shape} does not match {len(feature_columns)} feature names"
+        )
+
+    onnx_path = os.path.join(path, ONNX_FILE)
+    if backend == "onnx" and os.path.exists(onnx_path):
+        # Parity with sklearn was checked at export time (training_v1.py)
+        return OnnxScorer(onnx_path, onnx_threads), feature_columns, meta["model_version"]
+    if backend not in ("auto", "linear"):
+        print(f"Backend '{backend}' not available from a serving artifact, using the linear kernel")
+
+    return LinearScorer(coef, intercept), feature_columns, meta["model_version"]
@@ -0,0 +1,168 @@
+# Dynamic micro-batching for single-transaction /predict calls
+#
+# Concurrent requests are queued and flushed together when either
+# max_batch_size rows are waiting or the oldest row has waited max_wait_ms.
+# The whole batch is scored with one vectorized call in a worker thread and
+# every caller gets its own row back through an asyncio future.
+# Rows submitted with different contexts (e.g. model versions during a hot
+# reload) are never mixed: each context in a flush is scored separately.
+# Up to max_concurrent_flushes batches are scored at once (one per scoring
+# worker), so collecting the next batch never waits for the previous score.
+
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        score_fn,
+        max_batch_size=64,
+        max_wait_ms=2.0,
+        batch_size_metric=None,
+        queue_wait_metric=None,
+        run_fn=None,
+        max_concurrent_flushes=1,
+    ):
+        # score_fn: (matrix, context) -> n_rows fraud probabilities
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size_metric = batch_size_metric
+        self.queue_wait_metric = queue_wait_metric
+        # async (fn, *args) -> result; defaults to the loop's default executor
+        self.run_fn = run_fn or self._run_in_default_executor
+        self.max_concurrent_flushes = max_concurrent_flushes
+
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self._flushes = set()
+
+    # -----------------------
+    # LIFECYCLE
+    # -----------------------
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_flushes)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # In-flight flushes fail their own callers when cancelled
+        for flush in list(self._flushes):
+            flush.cancel()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        # Fail anything still waiting so callers don't hang on shutdown
+        while not self._queue.empty():
+            _, future, _, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    # -----------------------
+    # PUBLIC API
+    # -----------------------
+
+    async def submit(self, row, context=None):
+        """Queue one feature row (1-D float array) and wait for its probability."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter(), context))
+        return await future
+
+    # -----------------------
+    # FLUSH LOOP
+    # -----------------------
+
+    @staticmethod
+    async def _run_in_default_executor(fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _collect(self):
+        # Block for the first row, then keep collecting until size or time limit
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without touching the timer
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    @staticmethod
+    def _fail(items, error):
+        for _, future, _, _ in items:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _flush(self, items, context):
+        matrix = np.vstack([row for row, _, _, _ in items])
+
+        try:
+            probs = await self.run_fn(self.score_fn, matrix, context)
+        except asyncio.CancelledError:
+            self._fail(items, RuntimeError("Micro-batcher stopped"))
+            raise
+        except Exception as e:
+            self._fail(items, e)
+            return
+
+        for (_, future, _, _), prob in zip(items, probs):
+            # Caller may have gone away (client disconnect / cancellation)
+            if not future.done():
+                future.set_result(float(prob))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            flushed_at = time.perf_counter()
+
+            if self.batch_size_metric is not None:
+                self.batch_size_metric.observe(len(batch))
+            if self.queue_wait_metric is not None:
+                for _, _, enqueued_at, _ in batch:
+                    self.queue_wait_metric.observe(flushed_at - enqueued_at)
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[3]), []).append(item)
+            waiting = list(groups.values())
+            try:
+                while waiting:
+                    # Wait only for a free slot, not for the previous batch's score
+                    await self._slots.acquire()
+                    items = waiting.pop(0)
+                    flush = asyncio.create_task(self._flush(items, items[0][3]))
+                    self._flushes.add(flush)
+                    flush.add_done_callback(self._flush_done)
+            except asyncio.CancelledError:
+                for items in waiting:
+                    self._fail(items, RuntimeError("Micro-batcher stopped"))
+                raise
+
+    def _flush_done(self, flush):
+        self._flushes.discard(flush)
+        self._slots.release()
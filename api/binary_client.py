@@ -0,0 +1,130 @@
+# Python client for the binary scoring protocol (api/binary_protocol.py)
+#
+#   client = BinaryScoringClient(path="/run/fraud-api/score.sock")
+#   client.feature_columns                 # order to put values in
+#   probs = client.score(matrix)           # (n_rows x n_features) -> n_rows floats
+#   results = client.score_pipelined(rows) # many requests in flight on one connection
+#
+# Blocking sockets, no asyncio: meant to be dropped into any caller.
+
+import socket
+
+import numpy as np
+import orjson
+
+from api.binary_protocol import (
+    LENGTH,
+    OP_INFO,
+    OP_SCORE,
+    STATUS_OK,
+    STATUS_OVERLOADED,
+    decode_response,
+    encode_request,
+)
+
+
+class ScoringError(Exception):
+    def __init__(self, status, message):
+        self.status = status
+        super().__init__(message)
+
+    @property
+    def overloaded(self):
+        return self.status == STATUS_OVERLOADED
+
+
+class BinaryScoringClient:
+    def __init__(self, path=None, host="127.0.0.1", port=None, timeout=5.0, dtype=np.float64):
+        if path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(path)
+        else:
+            self.sock = socket.create_connection((host, port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(timeout)
+        self.dtype = np.dtype(dtype)
+        self._next_id = 0
+
+        info = self._call(encode_request(self._request_id(), None, op=OP_INFO), op=OP_INFO)
+        info = orjson.loads(info[3])
+        self.model_version = info["model_version"]
+        self.feature_columns = info["feature_columns"]
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------
+    # FRAMING
+    # -----------------------
+
+    def _request_id(self):
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        return self._next_id
+
+    def _recv_exactly(self, n):
+        buf = bytearray(n)
+        view = memoryview(buf)
+        while n:
+            got = self.sock.recv_into(view[len(buf) - n:], n)
+            if not got:
+                raise ConnectionError("Connection closed by server")
+            n -= got
+        return buf
+
+    def _read_response(self, op=OP_SCORE):
+        prefix = self._recv_exactly(LENGTH.size)
+        (length,) = LENGTH.unpack(prefix)
+        return decode_response(prefix + self._recv_exactly(length), op)
+
+    def _call(self, frame, op=OP_SCORE):
+        self.sock.sendall(frame)
+        return self._read_response(op)
+
+    def _result(self, response):
+        _, status, version, payload = response
+        if status != STATUS_OK:
+            raise ScoringError(status, payload.decode(errors="replace"))
+        self.model_version = version
+        return payload
+
+    # -----------------------
+    # SCORING
+    # -----------------------
+
+    def score(self, matrix):
+        """Score one row or an (n_rows x n_features) batch; returns a float64 array."""
+        matrix = np.asarray(matrix, dtype=self.dtype)
+        return self._result(self._call(encode_request(self._request_id(), np.atleast_2d(matrix))))
+
+    def score_pipelined(self, matrices, depth=32):
+        """
+        Keep up to `depth` requests in flight on the connection and return the
+        results in input order. Failed requests come back as ScoringError instances.
+        """
+        frames = []
+        ids = []
+        for matrix in matrices:
+            request_id = self._request_id()
+            ids.append(request_id)
+            frames.append(encode_request(request_id, np.atleast_2d(np.asarray(matrix, dtype=self.dtype))))
+
+        # Responses may arrive out of order; match them by request_id
+        results = {}
+        sent = 0
+        while len(results) < len(frames):
+            window = frames[sent:sent + depth - (sent - len(results))]
+            if window:
+                self.sock.sendall(b"".join(window))
+                sent += len(window)
+            response = self._read_response()
+            try:
+                results[response[0]] = self._result(response)
+            except ScoringError as e:
+                results[response[0]] = e
+        return [results[request_id] for request_id in ids]
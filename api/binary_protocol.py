@@ -0,0 +1,192 @@
+# Length-prefixed binary scoring protocol for co-located callers
+#
+# An alternative to HTTP /predict for sidecars on the same host: a listener on
+# a Unix domain socket (or local TCP port) inside the API process, sharing the
+# loaded model registry, scoring executor, cache and metrics with FastAPI.
+#
+# Every frame starts with a little-endian header; `length` counts the bytes
+# after the length field itself.
+#
+#   request : u32 length | u32 request_id | u8 op | u8 dtype | u16 reserved
+#             | u32 n_rows | u32 n_features | n_rows*n_features values
+#   response: u32 length | u32 request_id | u8 status | u8 reserved | u16 version_len
+#             | u32 n_rows | version (utf-8) | n_rows float64 probabilities
+#
+# Values are raw float32/float64 in GET /features order. On a non-OK status
+# the body after the header is a utf-8 error message instead of probabilities.
+# OP_INFO returns the model version and feature_columns as JSON.
+#
+# A connection may pipeline requests: frames are scored concurrently (up to
+# max_inflight per connection) and answered as they finish, so responses can
+# come back out of order and are matched by request_id.
+
+import asyncio
+import os
+import struct
+
+import numpy as np
+import orjson
+
+from api.admission import Overloaded
+from api.features import FeatureError
+
+REQUEST_HEADER = struct.Struct("<IIBBHII")
+RESPONSE_HEADER = struct.Struct("<IIBBHI")
+LENGTH = struct.Struct("<I")
+
+OP_SCORE = 1
+OP_INFO = 2
+
+DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f8")}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+STATUS_OK = 0
+STATUS_BAD_REQUEST = 1
+STATUS_OVERLOADED = 2
+STATUS_ERROR = 3
+
+
+class ProtocolError(ValueError):
+    """Malformed frame; the connection is closed."""
+
+
+# -----------------------
+# FRAMING (shared by server and client)
+# -----------------------
+
+def encode_request(request_id, matrix, op=OP_SCORE):
+    if op == OP_INFO:
+        return REQUEST_HEADER.pack(REQUEST_HEADER.size - LENGTH.size, request_id, op, 0, 0, 0, 0)
+
+    matrix = np.asarray(matrix)
+    if matrix.dtype not in DTYPE_CODES:
+        matrix = matrix.astype("<f8")
+    matrix = np.ascontiguousarray(matrix.reshape(-1, matrix.shape[-1]))
+    body = matrix.tobytes()
+    header = REQUEST_HEADER.pack(
+        REQUEST_HEADER.size - LENGTH.size + len(body),
+        request_id, op, DTYPE_CODES[matrix.dtype], 0, matrix.shape[0], matrix.shape[1]
+    )
+    return header + body
+
+
+def encode_response(request_id, status, body=b"", version="", n_rows=0):
+    version = version.encode()
+    return RESPONSE_HEADER.pack(
+        RESPONSE_HEADER.size - LENGTH.size + len(version) + len(body),
+        request_id, status, 0, len(version), n_rows
+    ) + version + body
+
+
+def decode_response(frame, op=OP_SCORE):
+    """
+    Parse a full response frame (length prefix included) -> (request_id, status, version, payload).
+    `op` is the op of the request being answered: an OK score response always
+    decodes to a float64 array (empty for 0 rows), anything else to bytes.
+    """
+    _, request_id, status, _, version_len, n_rows = RESPONSE_HEADER.unpack_from(frame)
+    start = RESPONSE_HEADER.size
+    version = frame[start:start + version_len].decode()
+    body = frame[start + version_len:]
+    if status == STATUS_OK and op == OP_SCORE:
+        return request_id, status, version, np.frombuffer(body, dtype="<f8", count=n_rows)
+    return request_id, status, version, bytes(body)
+
+
+# -----------------------
+# SERVER
+# -----------------------
+
+class BinaryScoringServer:
+    def __init__(self, score_fn, info_fn, max_frame_bytes=16 * 1024 * 1024, max_inflight=64):
+        # score_fn: async (float64 matrix) -> (probabilities, model_version)
+        # info_fn: () -> JSON-serializable dict
+        self.score_fn = score_fn
+        self.info_fn = info_fn
+        self.max_frame_bytes = max_frame_bytes
+        self.max_inflight = max_inflight
+        self._servers = []
+        self._connections = set()
+
+    async def start_unix(self, path):
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        server = await asyncio.start_unix_server(self._handle, path=path)
+        self._servers.append(server)
+
+    async def start_tcp(self, host, port):
+        # reuse_port: every pre-fork worker binds the same port and the kernel spreads connections
+        server = await asyncio.start_server(self._handle, host=host, port=port, reuse_port=True)
+        self._servers.append(server)
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+        for task in list(self._connections):
+            task.cancel()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        inflight = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+        try:
+            while True:
+                try:
+                    prefix = await reader.readexactly(LENGTH.size)
+                except asyncio.IncompleteReadError:
+                    break  # client closed
+                (length,) = LENGTH.unpack(prefix)
+                if length < REQUEST_HEADER.size - LENGTH.size or length > self.max_frame_bytes:
+                    raise ProtocolError(f"Bad frame length {length}")
+                frame = await reader.readexactly(length)
+
+                # Backpressure: stop reading once max_inflight frames are being scored
+                await inflight.acquire()
+                job = asyncio.create_task(self._respond(prefix + frame, writer))
+                pending.add(job)
+                job.add_done_callback(pending.discard)
+                job.add_done_callback(lambda _: inflight.release())
+        except (ProtocolError, asyncio.IncompleteReadError, ConnectionError) as e:
+            print(f"Binary protocol connection closed: {e!r}")
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+            self._connections.discard(task)
+
+    async def _respond(self, frame, writer):
+        _, request_id, op, dtype, _, n_rows, n_features = REQUEST_HEADER.unpack_from(frame)
+        try:
+            if op == OP_INFO:
+                response = encode_response(request_id, STATUS_OK, orjson.dumps(self.info_fn()))
+            elif op == OP_SCORE:
+                response = await self._score(request_id, frame, dtype, n_rows, n_features)
+            else:
+                response = encode_response(request_id, STATUS_BAD_REQUEST, f"Unknown op {op}".encode())
+        except Overloaded as e:
+            response = encode_response(request_id, STATUS_OVERLOADED, str(e).encode())
+        except FeatureError as e:
+            response = encode_response(request_id, STATUS_BAD_REQUEST, str(e).encode())
+        except Exception as e:
+            response = encode_response(request_id, STATUS_ERROR, str(e).encode())
+
+        # One write per frame, so pipelined responses never interleave
+        writer.write(response)
+        await writer.drain()
+
+    async def _score(self, request_id, frame, dtype, n_rows, n_features):
+        if dtype not in DTYPES:
+            raise FeatureError(f"Unknown dtype code {dtype}")
+        values = memoryview(frame)[REQUEST_HEADER.size:]
+        if len(values) != n_rows * n_features * DTYPES[dtype].itemsize:
+            raise FeatureError("Payload size does not match n_rows x n_features")
+
+        matrix = np.frombuffer(values, dtype=DTYPES[dtype]).reshape(n_rows, n_features)
+        probs, version = await self.score_fn(matrix.astype(np.float64))
+        return encode_response(
+            request_id, STATUS_OK, np.asarray(probs, dtype="<f8").tobytes(), version, n_rows
+        )
@@ -0,0 +1,98 @@
+# In-process prediction cache for duplicate /predict traffic
+#
+# Keyed by a 128-bit BLAKE2b digest of the assembled float64 feature vector,
+# so two requests hit the same entry exactly when the model would see the same
+# input (key order, int vs float and extra ignored keys don't matter).
+# Entries are scoped to a model version: the first lookup under a new version
+# drops the whole cache, and late writes from the old version are ignored, so a
+# new model never serves an old model's scores.
+# Bounded size with LRU eviction plus a per-entry TTL.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        max_size,
+        ttl_seconds,
+        hit_metric=None,
+        miss_metric=None,
+        eviction_metric=None,
+        size_metric=None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.hit_metric = hit_metric
+        self.miss_metric = miss_metric
+        self.eviction_metric = eviction_metric
+        self.size_metric = size_metric
+
+        self.version = None
+        self._entries = OrderedDict()  # digest -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(row):
+        return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            if self._entries and self.eviction_metric is not None:
+                self.eviction_metric.labels("model_change").inc(len(self._entries))
+            self._entries.clear()
+            self.version = version
+
+    def _update_size(self):
+        if self.size_metric is not None:
+            self.size_metric.set(len(self._entries))
+
+    def get(self, key, version):
+        """Return the cached value, or None on miss/expiry."""
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < now:
+                del self._entries[key]
+                if self.eviction_metric is not None:
+                    self.eviction_metric.labels("ttl").inc()
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._update_size()
+
+        if entry is None:
+            if self.miss_metric is not None:
+                self.miss_metric.inc()
+            return None
+
+        if self.hit_metric is not None:
+            self.hit_metric.inc()
+        return entry[0]
+
+    def put(self, key, version, value):
+        with self._lock:
+            if version != self.version:
+                # Late result from a version that was swapped out mid-request
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+
+            evicted = 0
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self._update_size()
+
+        if evicted and self.eviction_metric is not None:
+            self.eviction_metric.labels("lru").inc(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._update_size()
@@ -0,0 +1,133 @@
+# Request payload decoding for the scoring endpoints
+#
+# Supported request encodings (Content-Type):
+#   application/json                      -> {"data": {...}}, {"features": [...]}, batch variants
+#   application/msgpack, application/x-msgpack -> same structures, msgpack-encoded
+#   application/vnd.apache.arrow.stream   -> Arrow IPC stream, batch endpoint only
+#
+# Positional payloads ("features" / "rows") must be in the order returned by
+# GET /features, which skips per-key dict handling entirely.
+# msgpack and pyarrow are optional: the encodings are only offered if installed.
+
+import importlib.util
+
+import numpy as np
+import orjson
+
+from api.features import FeatureError, MissingFeatureError
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+# pyarrow is heavy to import, so it is only loaded on the first Arrow request
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+class PayloadError(ValueError):
+    """Body could not be decoded with the declared Content-Type (-> 400)."""
+
+
+class UnsupportedMediaType(ValueError):
+    """Content-Type not supported by this endpoint / install (-> 415)."""
+
+
+# -----------------------
+# CONTENT TYPES
+# -----------------------
+
+def media_type(content_type):
+    """Normalize a Content-Type header ('application/json; charset=utf-8' -> 'application/json')."""
+    if not content_type:
+        return JSON
+    base = content_type.split(";", 1)[0].strip().lower()
+    return _ALIASES.get(base, base)
+
+
+def supported_media_types(batch=False):
+    types = [JSON]
+    if msgpack is not None:
+        types.append(MSGPACK)
+    if batch and HAS_PYARROW:
+        types.append(ARROW_STREAM)
+    return types
+
+
+# -----------------------
+# DECODING
+# -----------------------
+
+def decode(body, content_type):
+    """Decode a JSON/msgpack body into Python objects."""
+    kind = media_type(content_type)
+    try:
+        if kind == JSON:
+            return orjson.loads(body)
+        if kind == MSGPACK and msgpack is not None:
+            return msgpack.unpackb(body, raw=False)
+    except (orjson.JSONDecodeError, ValueError) as e:
+        raise PayloadError(f"Could not decode {kind} body: {e}") from None
+    except Exception as e:  # msgpack raises several unrelated exception types
+        raise PayloadError(f"Could not decode {kind} body: {e}") from None
+
+    raise UnsupportedMediaType(
+        f"Unsupported Content-Type '{kind}'. Supported: {supported_media_types()}"
+    )
+
+
+def positional_matrix(rows, n_features):
+    """
+    Convert positional rows (list of equal-length float lists, or one flat
+    list for a single row) into a 2-D float64 matrix.
+    """
+    try:
+        matrix = np.asarray(rows, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise FeatureError(f"Positional features must be numeric: {e}") from None
+
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[1] != n_features:
+        raise FeatureError(
+            f"Expected {n_features} positional features per row in /features order, "
+            f"got shape {list(matrix.shape)}"
+        )
+    return matrix
+
+
+def arrow_matrix(body, feature_columns):
+    """Read an Arrow IPC stream into an (n_rows x n_features) float64 matrix, selected by column name."""
+    if not HAS_PYARROW:
+        raise UnsupportedMediaType("Arrow payloads require pyarrow to be installed")
+
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except Exception as e:
+        raise PayloadError(f"Could not decode Arrow IPC stream: {e}") from None
+
+    missing = [col for col in feature_columns if col not in table.column_names]
+    if missing:
+        raise MissingFeatureError(missing)
+
+    matrix = np.empty((table.num_rows, len(feature_columns)), dtype=np.float64)
+    for j, col in enumerate(feature_columns):
+        try:
+            # Nulls become NaN and are reported per row by the caller
+            matrix[:, j] = table.column(col).to_numpy(zero_copy_only=False)
+        except (TypeError, ValueError, pa.ArrowInvalid) as e:
+            raise FeatureError(f"Column '{col}' is not numeric: {e}") from None
+    return matrix
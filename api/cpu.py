@@ -0,0 +1,29 @@
+# CPU budget of this container, shared by the pre-fork server (worker count)
+# and the scoring backends (thread pool sizes)
+
+import os
+
+
+def cpu_limit():
+    """CPUs available to this container: cgroup quota if set, else os.cpu_count()."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return float(quota) / float(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return float(os.cpu_count() or 1)
@@ -0,0 +1,238 @@
+# Online feature-drift statistics against the training baseline
+#
+# training/training_v1.py writes drift_baseline.json next to the serving
+# artifact: per feature, the inner bin edges (training deciles), the training
+# share of rows per bin, mean, std and zero rate (missing values became 0 via
+# fillna(0) in feature engineering, so the zero rate is the missing-rate proxy).
+#
+# The API hands scored rows to DriftMonitor.observe() (sampled put_nowait on a
+# bounded queue, like the shadow scorer). A background thread folds them into
+# fixed-size per-feature accumulators with whole-matrix NumPy ops:
+#   - count / mean / M2 (Welford, merged per batch with Chan's formula)
+#   - histogram counts over the baseline bins
+#   - zero and non-finite counts
+# Every publish_seconds it sets PSI, mean shift (in training std units) and
+# zero-rate change gauges per feature. Accumulators reset every window_seconds
+# so the scores describe recent traffic rather than everything since startup.
+
+import json
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+SUPPORTED_FORMAT_VERSIONS = (1,)
+PSI_EPSILON = 1e-4
+
+
+def load_drift_baseline(path):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("format_version") not in SUPPORTED_FORMAT_VERSIONS:
+        raise RuntimeError(f"Unsupported drift baseline format: {baseline.get('format_version')}")
+    return baseline
+
+
+def psi(expected, actual, epsilon=PSI_EPSILON):
+    """Population stability index per row of two (n_features x n_bins) proportion matrices."""
+    expected = np.clip(expected, epsilon, None)
+    actual = np.clip(actual, epsilon, None)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+
+
+class DriftAccumulator:
+    """Streaming per-feature stats; memory is fixed by n_features x n_bins."""
+
+    def __init__(self, inner_edges):
+        self.inner_edges = inner_edges  # (n_features, n_bins - 1)
+        n_features, n_inner = inner_edges.shape
+        self.n_bins = n_inner + 1
+        self._bin_offsets = np.arange(n_features) * self.n_bins
+
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.hist = np.zeros((n_features, self.n_bins), dtype=np.int64)
+        self.zeros = np.zeros(n_features, dtype=np.int64)
+        self.non_finite = np.zeros(n_features, dtype=np.int64)
+
+    def update(self, matrix):
+        finite = np.isfinite(matrix)
+        self.non_finite += (~finite).sum(axis=0)
+        # Non-finite cells never reach the model; keep them out of the moments too
+        matrix = matrix[finite.all(axis=1)]
+        n = len(matrix)
+        if n == 0:
+            return
+
+        self.zeros += (matrix == 0).sum(axis=0)
+
+        # Bin index per cell = number of inner edges below it, for all features at once
+        bins = (matrix[:, :, None] > self.inner_edges[None, :, :]).sum(axis=2)
+        self.hist += np.bincount(
+            (bins + self._bin_offsets).ravel(), minlength=self.hist.size
+        ).reshape(self.hist.shape)
+
+        # Chan et al. merge of the batch's (n, mean, M2) into the running Welford state
+        batch_mean = matrix.mean(axis=0)
+        batch_m2 = ((matrix - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += batch_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    def proportions(self):
+        return self.hist / max(self.count, 1)
+
+    def variance(self):
+        return self.m2 / max(self.count - 1, 1)
+
+
+class DriftMonitor:
+    def __init__(
+        self,
+        baseline,
+        sample_rate=1.0,
+        max_queue=1024,
+        max_batch_rows=1024,
+        publish_seconds=30.0,
+        window_seconds=3600.0,
+        min_rows=500,
+        metrics=None,
+    ):
+        self.feature_columns = list(baseline["feature_columns"])
+        self.inner_edges = np.asarray(baseline["inner_edges"], dtype=np.float64)
+        self.expected = np.asarray(baseline["proportions"], dtype=np.float64)
+        self.base_mean = np.asarray(baseline["mean"], dtype=np.float64)
+        self.base_std = np.asarray(baseline["std"], dtype=np.float64)
+        self.base_zero_rate = np.asarray(baseline["zero_rate"], dtype=np.float64)
+
+        self.sample_rate = sample_rate
+        self.max_batch_rows = max_batch_rows
+        self.publish_seconds = publish_seconds
+        self.window_seconds = window_seconds
+        self.min_rows = min_rows
+        # dict with optional keys: psi, mean_shift, zero_rate_delta (labeled by feature),
+        # max_psi, window_rows, dropped
+        self.metrics = metrics or {}
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._acc = DriftAccumulator(self.inner_edges)
+        self._window_started = time.monotonic()
+        self._matched_version = None
+
+        self._lock = threading.Lock()
+        self.last_scores = None
+
+    # -----------------------
+    # LIFECYCLE
+    # -----------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # -----------------------
+    # REQUEST PATH
+    # -----------------------
+
+    def observe(self, matrix, mv):
+        """Queue scored rows for the drift accumulators. Never blocks."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        # Baseline bins are per column position, so the layout must match
+        if mv.version != self._matched_version:
+            if mv.feature_columns != self.feature_columns:
+                return
+            self._matched_version = mv.version
+        rows = np.array(matrix, dtype=np.float64, ndmin=2)
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            metric = self.metrics.get("dropped")
+            if metric is not None:
+                metric.inc(len(rows))
+
+    # -----------------------
+    # BACKGROUND WORKER
+    # -----------------------
+
+    def _drain(self, timeout):
+        try:
+            items = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        n_rows = len(items[0])
+        while n_rows < self.max_batch_rows:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item)
+        return items
+
+    def _run(self):
+        next_publish = time.monotonic() + self.publish_seconds
+        while not self._stop.is_set():
+            items = self._drain(timeout=min(0.5, max(next_publish - time.monotonic(), 0.01)))
+            if items:
+                self._acc.update(np.vstack(items))
+
+            now = time.monotonic()
+            if now >= next_publish:
+                next_publish = now + self.publish_seconds
+                self._publish()
+                if now - self._window_started >= self.window_seconds:
+                    self._acc = DriftAccumulator(self.inner_edges)
+                    self._window_started = now
+
+    def _publish(self):
+        acc = self._acc
+        window_rows = self.metrics.get("window_rows")
+        if window_rows is not None:
+            window_rows.set(acc.count)
+        if acc.count < self.min_rows:
+            return
+
+        scores = psi(self.expected, acc.proportions())
+        # Features that were constant in training (std 0) get no mean-shift score
+        safe_std = np.where(self.base_std > 0, self.base_std, np.nan)
+        mean_shift = np.abs(acc.mean - self.base_mean) / safe_std
+        zero_rate_delta = acc.zeros / acc.count - self.base_zero_rate
+
+        with self._lock:
+            self.last_scores = {
+                "rows": acc.count,
+                "psi": dict(zip(self.feature_columns, scores.tolist())),
+            }
+
+        for name, values in (("psi", scores), ("mean_shift", mean_shift), ("zero_rate_delta", zero_rate_delta)):
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            for col, value in zip(self.feature_columns, values.tolist()):
+                if value == value:  # skip NaN
+                    metric.labels(col).set(value)
+
+        max_psi = self.metrics.get("max_psi")
+        if max_psi is not None:
+            max_psi.set(float(scores.max()))
+
+    def describe(self, top=10):
+        with self._lock:
+            last = self.last_scores
+        if last is None:
+            return {"rows": self._acc.count, "top_psi": []}
+        ranked = sorted(last["psi"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return {"rows": last["rows"], "top_psi": [{"feature": f, "psi": p} for f, p in ranked]}
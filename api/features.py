@@ -0,0 +1,117 @@
+# Precompiled feature-vector assembler
+#
+# Built once per model version from model.feature_names_in_, it maps each
+# feature name to a fixed column index and fills float64 NumPy rows straight
+# from record dicts. It assembles the dict records of /predict/batch and
+# /predict/stream (/predict itself validates through api/schema.py), producing
+# the same values as pd.DataFrame(records)[feature_columns] would.
+#
+# Optional features may be omitted and default to 0.0, with the same rule as
+# the compiled schema, so every endpoint accepts the same records.
+
+from operator import itemgetter
+
+import numpy as np
+
+
+# -----------------------
+# ERRORS
+# -----------------------
+
+class FeatureError(ValueError):
+    """Base class for request payloads that can't be turned into a feature row."""
+
+
+class MissingFeatureError(FeatureError):
+    def __init__(self, missing):
+        self.missing = missing
+        super().__init__(f"Missing features: {missing}")
+
+
+class ExtraFeatureError(FeatureError):
+    def __init__(self, extra):
+        self.extra = extra
+        super().__init__(f"Unexpected features: {extra}")
+
+
+class InvalidFeatureError(FeatureError):
+    def __init__(self, invalid):
+        self.invalid = invalid
+        super().__init__(f"Non-numeric feature values: {invalid}")
+
+
+# -----------------------
+# ASSEMBLER
+# -----------------------
+
+class FeatureAssembler:
+    def __init__(self, feature_columns, strict=False, optional_features=()):
+        self.feature_columns = tuple(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self.index = {name: i for i, name in enumerate(self.feature_columns)}
+        # strict=True rejects unknown keys; the DataFrame path silently ignored them
+        self.strict = strict
+
+        # Same "*" / list-of-names rule as FeatureSchema
+        optional = set(self.feature_columns) if optional_features == "*" else set(optional_features)
+        self.required_features = tuple(col for col in self.feature_columns if col not in optional)
+
+        # itemgetter pulls every value in one C-level call; with a single
+        # feature it returns a scalar instead of a tuple, so wrap that case
+        getter = itemgetter(*self.feature_columns)
+        if self.n_features == 1:
+            self._getter = lambda data: (getter(data),)
+        else:
+            self._getter = getter
+
+    def _fill(self, data, row):
+        try:
+            row[:] = self._getter(data)
+        except KeyError:
+            # Slow path only when something is omitted
+            self._fill_with_defaults(data, row)
+        except (TypeError, ValueError):
+            raise InvalidFeatureError(self._invalid_features(data)) from None
+
+        if self.strict and len(data) != self.n_features:
+            extra = [key for key in data if key not in self.index]
+            if extra:
+                raise ExtraFeatureError(extra)
+
+        return row
+
+    def _fill_with_defaults(self, data, row):
+        missing = [col for col in self.required_features if col not in data]
+        if missing:
+            raise MissingFeatureError(missing)
+        try:
+            row[:] = [data.get(col, 0.0) for col in self.feature_columns]
+        except (TypeError, ValueError):
+            raise InvalidFeatureError(self._invalid_features(data)) from None
+
+    def _invalid_features(self, data):
+        invalid = []
+        for col in self.feature_columns:
+            try:
+                float(data.get(col, 0.0))
+            except (TypeError, ValueError):
+                invalid.append(col)
+        return invalid
+
+    def assemble(self, data):
+        """Return one record as a new 1-D float64 row; raises FeatureError (benchmarks, tooling)."""
+        return self._fill(data, np.empty(self.n_features, dtype=np.float64))
+
+    def assemble_many(self, records):
+        """
+        Build one (n_records x n_features) matrix. Rows that fail are left as
+        zeros and reported in the returned {row_index: message} dict.
+        """
+        matrix = np.zeros((len(records), self.n_features), dtype=np.float64)
+        errors = {}
+        for i, record in enumerate(records):
+            try:
+                self._fill(record, matrix[i])
+            except FeatureError as e:
+                errors[i] = str(e)
+        return matrix, errors
@@ -1,10 +1,38 @@
 # FastAPI - V1 simple API -> http://127.0.0.1:8000/docs
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import time
+IMPORT_START = time.perf_counter() # startup phase timing starts before the heavy imports
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError, model_validator
 from contextlib import asynccontextmanager
-import pandas as pd
-import mlflow.sklearn
+from typing import Dict, List, Optional
+import asyncio
+import functools
+import hmac
+import os
+import warnings
+import orjson
+import numpy as np
+
+from api import codecs
+from api.artifact import ONNX_FILE, load_serving_artifact
+from api.admission import AdmissionController, Overloaded
+from api.batching import MicroBatcher
+from api.binary_protocol import BinaryScoringServer
+from api.cache import PredictionCache
+from api.drift import DriftMonitor, load_drift_baseline
+from api.features import FeatureAssembler, FeatureError
+from api.registry import ModelRegistry, ModelVersion, warm_up
+from api.schema import FeatureSchema
+from api.cpu import cpu_limit
+from api.scoring import BACKENDS, build_scorer
+from api.shadow import ShadowScorer
+from api import streaming
+from api.metrics_export import MetricsExporter, multiprocess_enabled
+from api.traffic_log import TrafficLogger
+from api.timing import NULL_TIMER, STAGE_BUCKETS, ServerTimingMiddleware, sampled_timer
 
 # -----------------------
 # Import promethus client for metrics
@@ -13,11 +41,11 @@ from prometheus_client import (
     Counter,
     Histogram,
     Gauge,
-    generate_latest,
     CONTENT_TYPE_LATEST
 )
-from fastapi.responses import Response
-import time
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+IMPORTS_DONE = time.perf_counter()
 
 
 
@@ -25,9 +53,111 @@ import time
 # CONFIG
 # -----------------------
 
-RUN_ID = "d68e2c6350b4442f88e217726763b0f0" # replace with your actual run ID
+RUN_ID = os.getenv("MODEL_RUN_ID", "d68e2c6350b4442f88e217726763b0f0") # replace with your actual run ID
 MODEL_URI = f"runs:/{RUN_ID}/model"
 
+# Compact serving artifact exported by training_v1.py (coef/intercept .npy + meta.json).
+# When set, the API loads it directly and never imports mlflow.
+SERVING_ARTIFACT = os.getenv("SERVING_ARTIFACT", "")
+
+# Hot reload: shared secret for /admin/* (the admin API is disabled when unset) and a
+# file whose contents ("runs:/<id>/model", a bare run id, or a serving artifact dir)
+# trigger a reload when changed
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MODEL_RELOAD_FILE = os.getenv("MODEL_RELOAD_FILE", "")
+MODEL_RELOAD_POLL_SECONDS = float(os.getenv("MODEL_RELOAD_POLL_SECONDS", "10"))
+# Pre-fork mode (api/serve.py sets it): reload/shadow commands are appended to this
+# shared log and every worker applies them, not just the one that took the request
+ADMIN_COMMAND_LOG = os.getenv("ADMIN_COMMAND_LOG", "")
+ADMIN_COMMAND_POLL_SECONDS = float(os.getenv("ADMIN_COMMAND_POLL_SECONDS", "1"))
+
+# Candidate model: shadow-scored off the request path, optionally A/B-served to a share of traffic
+SHADOW_MODEL_SOURCE = os.getenv("SHADOW_MODEL_SOURCE", "")
+AB_CANDIDATE_PERCENT = float(os.getenv("AB_CANDIDATE_PERCENT", "0"))
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "1.0"))
+
+# Sampled logging of scored traffic to rotating NDJSON files (off unless a directory is set)
+TRAFFIC_LOG_DIR = os.getenv("TRAFFIC_LOG_DIR", "")
+TRAFFIC_LOG_SAMPLE_RATE = float(os.getenv("TRAFFIC_LOG_SAMPLE_RATE", "0.01"))
+TRAFFIC_LOG_MAX_QUEUE = int(os.getenv("TRAFFIC_LOG_MAX_QUEUE", "1024"))
+TRAFFIC_LOG_ROTATE_MB = float(os.getenv("TRAFFIC_LOG_ROTATE_MB", "64"))
+TRAFFIC_LOG_ROTATE_SECONDS = float(os.getenv("TRAFFIC_LOG_ROTATE_SECONDS", "3600"))
+TRAFFIC_LOG_KEEP_FILES = int(os.getenv("TRAFFIC_LOG_KEEP_FILES", "48"))
+
+# Online drift scores vs the training baseline (drift_baseline.json, written by training)
+DRIFT_BASELINE = os.getenv(
+    "DRIFT_BASELINE",
+    os.path.join(SERVING_ARTIFACT, "drift_baseline.json") if SERVING_ARTIFACT else ""
+)
+DRIFT_SAMPLE_RATE = float(os.getenv("DRIFT_SAMPLE_RATE", "1.0"))
+DRIFT_PUBLISH_SECONDS = float(os.getenv("DRIFT_PUBLISH_SECONDS", "30"))
+DRIFT_WINDOW_SECONDS = float(os.getenv("DRIFT_WINDOW_SECONDS", "3600"))
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "500"))
+FRAUD_THRESHOLD = float(os.getenv("FRAUD_THRESHOLD", "0.5"))
+
+# Startup warm-up: synthetic batches pushed through the real scoring path before /ready passes
+WARMUP_BATCHES = int(os.getenv("WARMUP_BATCHES", "3"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "64"))
+
+# Binary scoring protocol for co-located callers (api/binary_protocol.py): a Unix
+# socket path and/or a local TCP port (0 = off). With api.serve (pre-fork) use
+# the TCP port: every worker binds it with SO_REUSEPORT.
+BINARY_SOCKET_PATH = os.getenv("BINARY_SOCKET_PATH", "")
+BINARY_TCP_PORT = int(os.getenv("BINARY_TCP_PORT", "0"))
+BINARY_TCP_HOST = os.getenv("BINARY_TCP_HOST", "127.0.0.1")
+BINARY_MAX_INFLIGHT = int(os.getenv("BINARY_MAX_INFLIGHT", "64"))
+BINARY_MAX_FRAME_BYTES = int(os.getenv("BINARY_MAX_FRAME_BYTES", str(16 * 1024 * 1024)))
+
+# Share of requests that record the detailed per-stage latency breakdown
+TIMING_SAMPLE_RATE = float(os.getenv("TIMING_SAMPLE_RATE", "0.1"))
+
+# How long a rendered /metrics payload is reused (merging multi-worker metric files isn't free)
+METRICS_CACHE_SECONDS = float(os.getenv("METRICS_CACHE_SECONDS", "1"))
+
+# Upper bound on rows accepted by /predict/batch in one call
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+# Opt-in server-side micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+
+# Optional in-process cache of /predict results (0 disables it)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "60"))
+
+# Streaming endpoint: records scored per chunk, and the longest line we will buffer
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
+# Times a shed chunk is retried (after Retry-After) before the stream ends with an error line
+STREAM_MAX_RETRIES = int(os.getenv("STREAM_MAX_RETRIES", "10"))
+
+# Inference backend: auto (native linear kernel if it matches sklearn, else sklearn),
+# sklearn, or onnx (model.onnx exported at training time, run with onnxruntime)
+SCORING_BACKEND = os.getenv("SCORING_BACKEND", "auto").lower()
+if SCORING_BACKEND not in BACKENDS:
+    raise RuntimeError(f"SCORING_BACKEND must be one of {BACKENDS}, got '{SCORING_BACKEND}'")
+# onnxruntime intra-op threads per call; 0 = split the pod CPU limit across scoring workers
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+
+# Dedicated scoring executor + admission control (load shedding)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+SCORING_MAX_QUEUE = int(os.getenv("SCORING_MAX_QUEUE", "64"))
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", "500"))
+LATENCY_SLO_MS = float(os.getenv("LATENCY_SLO_MS", "200"))
+
+# Reject request keys that are not model features (default: ignore them, like the DataFrame path did)
+STRICT_FEATURES = os.getenv("STRICT_FEATURES", "false").lower() in ("1", "true", "yes")
+
+# Features requests may omit (/predict, /predict/batch, /predict/stream); they default to 0.0 like fillna(0) in feature engineering.
+# Comma-separated names, or "*" for all of them (default: every feature is required)
+OPTIONAL_FEATURES = os.getenv("OPTIONAL_FEATURES", "").strip()
+OPTIONAL_FEATURES = "*" if OPTIONAL_FEATURES == "*" else [f.strip() for f in OPTIONAL_FEATURES.split(",") if f.strip()]
+
+# Rows are assembled as NumPy arrays already in feature_columns order, so the
+# column-name check sklearn does for DataFrame-fitted models is redundant here.
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
 model= None
 
 # -----------------------
@@ -36,24 +166,245 @@ model= None
 
 PREDICTIONS_TOTAL = Counter(
     "predictions_total",
-    "Total number of prediction requests"
+    "Total number of scored transactions",
+    ["endpoint", "model_version"]
 )
 
 PREDICTION_ERRORS_TOTAL = Counter(
     "prediction_errors_total",
-    "Total number of prediction errors"
+    "Total number of prediction errors",
+    ["endpoint", "model_version"]
 )
 
 PREDICTION_LATENCY = Histogram(
     "prediction_latency_seconds",
-    "Prediction latency in seconds"
+    "Prediction latency in seconds",
+    ["endpoint", "model_version"],
+    buckets=STAGE_BUCKETS
+)
+
+STAGE_LATENCY = Histogram(
+    "prediction_stage_seconds",
+    "Per-stage latency of sampled scoring requests",
+    ["endpoint", "stage"],
+    buckets=STAGE_BUCKETS
+)
+
+SERVER_TIME = Histogram(
+    "http_server_time_seconds",
+    "End-to-end server time per request, from ASGI entry to last byte sent",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+
+MODEL_ACTIVE = Gauge(
+    "model_version_active",
+    "1 for the model version serving new requests, 0 for loaded versions still draining",
+    ["model_version"],
+    multiprocess_mode="livemax"
+)
+
+MODEL_RELOADS_TOTAL = Counter(
+    "model_reloads_total",
+    "Hot model reload attempts",
+    ["outcome"]
+)
+
+BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Number of transactions per /predict/batch call",
+    buckets=(1, 8, 32, 128, 512, 2048, 8192, 32768)
+)
+
+BATCH_ROW_LATENCY = Histogram(
+    "prediction_batch_row_latency_seconds",
+    "Batch latency divided by batch size (amortized per-transaction cost)",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+)
+
+MICROBATCH_SIZE = Histogram(
+    "microbatch_size",
+    "Realized number of /predict requests scored per micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+MICROBATCH_QUEUE_WAIT = Histogram(
+    "microbatch_queue_wait_seconds",
+    "Time a /predict request waited in the micro-batch queue before flush",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05)
 )
 
 IN_PROGRESS = Gauge(
     "prediction_requests_in_progress",
-    "Number of prediction requests in progress"
+    "Number of prediction requests in progress",
+    multiprocess_mode="livesum"
+)
+
+STREAM_RECORDS_TOTAL = Counter(
+    "stream_records_total",
+    "Records processed by /predict/stream",
+    ["outcome"]
+)
+
+STREAM_BYTES_TOTAL = Counter(
+    "stream_bytes_received_total",
+    "Request body bytes consumed by /predict/stream"
+)
+
+STREAM_CHUNKS_TOTAL = Counter(
+    "stream_chunks_total",
+    "Record chunks scored by /predict/stream"
+)
+
+STREAMS_IN_PROGRESS = Gauge(
+    "streams_in_progress",
+    "Number of open /predict/stream requests",
+    multiprocess_mode="livesum"
+)
+
+CACHE_HITS_TOTAL = Counter(
+    "prediction_cache_hits_total",
+    "/predict requests answered from the prediction cache"
+)
+
+CACHE_MISSES_TOTAL = Counter(
+    "prediction_cache_misses_total",
+    "/predict requests that had to be scored"
+)
+
+CACHE_EVICTIONS_TOTAL = Counter(
+    "prediction_cache_evictions_total",
+    "Prediction cache entries evicted",
+    ["reason"]
+)
+
+CACHE_SIZE = Gauge(
+    "prediction_cache_entries",
+    "Current number of prediction cache entries",
+    multiprocess_mode="livesum"
+)
+
+SHADOW_SCORED_TOTAL = Counter(
+    "shadow_scored_total",
+    "Transactions scored by the shadow candidate model"
+)
+
+SHADOW_DROPPED_TOTAL = Counter(
+    "shadow_dropped_total",
+    "Transactions not shadow-scored because the shadow queue was full"
+)
+
+SHADOW_FLIPS_TOTAL = Counter(
+    "shadow_decision_flips_total",
+    "Transactions where primary and candidate disagree at FRAUD_THRESHOLD"
+)
+
+SHADOW_ABS_DIFF = Histogram(
+    "shadow_abs_probability_diff",
+    "|candidate - primary| fraud probability per shadow-scored transaction",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+SHADOW_MEAN_ABS_DIFF = Gauge(
+    "shadow_mean_abs_probability_diff",
+    "Running mean |candidate - primary| fraud probability",
+    multiprocess_mode="livemostrecent"
+)
+
+SHADOW_MAX_ABS_DIFF = Gauge(
+    "shadow_max_abs_probability_diff",
+    "Largest |candidate - primary| fraud probability seen",
+    multiprocess_mode="livemax"
+)
+
+TRAFFIC_LOGGED_TOTAL = Counter(
+    "traffic_logged_total",
+    "Scored transactions written to the traffic log"
+)
+
+TRAFFIC_LOG_DROPPED_TOTAL = Counter(
+    "traffic_log_dropped_total",
+    "Sampled transactions not logged because the traffic log queue was full"
+)
+
+TRAFFIC_LOG_WRITE_ERRORS_TOTAL = Counter(
+    "traffic_log_write_errors_total",
+    "Failed traffic log batch writes"
+)
+
+TRAFFIC_LOG_BACKLOG = Gauge(
+    "traffic_log_backlog",
+    "Traffic log batches queued but not yet written",
+    multiprocess_mode="livesum"
+)
+
+FEATURE_PSI = Gauge(
+    "feature_drift_psi",
+    "Population stability index of live traffic vs the training baseline",
+    ["feature"],
+    multiprocess_mode="livemax"
+)
+
+FEATURE_MEAN_SHIFT = Gauge(
+    "feature_drift_mean_shift",
+    "|live mean - training mean| in training standard deviations",
+    ["feature"],
+    multiprocess_mode="livemax"
+)
+
+FEATURE_ZERO_RATE_DELTA = Gauge(
+    "feature_drift_zero_rate_delta",
+    "Live share of zero (incl. filled-missing) values minus the training share",
+    ["feature"],
+    multiprocess_mode="livemostrecent"
 )
 
+DRIFT_MAX_PSI = Gauge(
+    "feature_drift_max_psi",
+    "Largest per-feature PSI in the current drift window",
+    multiprocess_mode="livemax"
+)
+
+DRIFT_WINDOW_ROWS = Gauge(
+    "feature_drift_window_rows",
+    "Rows accumulated in the current drift window",
+    multiprocess_mode="livesum"
+)
+
+DRIFT_DROPPED_TOTAL = Counter(
+    "feature_drift_dropped_total",
+    "Scored rows not added to drift stats because the drift queue was full"
+)
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "startup_phase_seconds",
+    "Duration of each startup phase (imports, model_load, warm_up, total)",
+    ["phase"],
+    multiprocess_mode="livemax"
+)
+
+READY = Gauge(
+    "api_ready",
+    "1 once the model is loaded and warmed up, 0 otherwise",
+    multiprocess_mode="livemin"
+)
+
+SCORING_QUEUE_DEPTH = Gauge(
+    "scoring_queue_depth",
+    "Scoring jobs admitted but waiting for an executor thread",
+    multiprocess_mode="livesum"
+)
+
+SHED_REQUESTS_TOTAL = Counter(
+    "shed_requests_total",
+    "Requests rejected by admission control",
+    ["reason"]
+)
+
+
+# With PROMETHEUS_MULTIPROC_DIR set (multi-worker), gauges are merged across
+# workers per multiprocess_mode: live* modes ignore workers that have exited.
+METRICS_EXPORTER = MetricsExporter(cache_seconds=METRICS_CACHE_SECONDS)
 
 """
 # PROMETHEUS: Why global?
@@ -65,25 +416,417 @@ IN_PROGRESS = Gauge(
 # LIFESPAN HANDLER
 # -----------------------
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+# Set by preload_model() when the pre-fork server (api/serve.py) loads the
+# model in the parent process; forked workers then share it copy-on-write.
+PRELOADED_MODEL = None
+
+
+def onnx_threads():
+    if ONNX_THREADS > 0:
+        return ONNX_THREADS
+    if os.getenv("OMP_NUM_THREADS"):
+        # Set by the pre-fork server (one thread per worker process) or by the operator
+        return max(1, int(os.environ["OMP_NUM_THREADS"]))
+    # Scoring threads run in parallel: give each an equal share of the CPU limit
+    return max(1, int(cpu_limit() // SCORING_WORKERS))
+
+
+def load_model_state(source=None):
+    """
+    Load a ModelVersion from `source`: a serving artifact directory, an MLflow
+    model URI ("runs:/<id>/model") or a bare run id. Defaults to the configured model.
+    """
+    source = source or SERVING_ARTIFACT or MODEL_URI
+
+    if os.path.isdir(source):
+        try:
+            scorer, feature_columns, model_version = load_serving_artifact(
+                source, backend=SCORING_BACKEND, onnx_threads=onnx_threads()
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load serving artifact: {e}")
+
+        print(f"Serving artifact loaded from {source}")
+        print(f"Number of features: {len(feature_columns)}")
+        print(f"Scoring backend: {scorer.name}")
+
+        return ModelVersion(
+            model_version,
+            scorer,
+            feature_columns,
+            FeatureAssembler(feature_columns, strict=STRICT_FEATURES, optional_features=OPTIONAL_FEATURES),
+            schema=FeatureSchema(feature_columns, OPTIONAL_FEATURES, strict=STRICT_FEATURES),
+            source=source
+        )
+
+    if "/" not in source:
+        source = f"runs:/{source}/model"
+
+    # Fallback: full mlflow stack, imported only on this path (slow cold start)
+    import mlflow.sklearn
+
     try:
-        model = mlflow.sklearn.load_model(MODEL_URI)
+        model = mlflow.sklearn.load_model(source)
     except Exception as e:
         raise RuntimeError(f"Failed to load model: {e}")
 
     if not hasattr(model, "feature_names_in_"):
         raise RuntimeError("Model does not expose feature names")
 
-    app.state.model = model
-    app.state.feature_columns = list(model.feature_names_in_)
+    feature_columns = list(model.feature_names_in_)
+
+    onnx_path = None
+    if SCORING_BACKEND == "onnx" and source.startswith("runs:/"):
+        # Exported next to the serving artifact: runs:/<run_id>/serving/model.onnx
+        import mlflow.artifacts
+        try:
+            onnx_path = mlflow.artifacts.download_artifacts(
+                f"runs:/{source.split('/')[1]}/serving/{ONNX_FILE}"
+            )
+        except Exception as e:
+            print(f"No ONNX graph for {source}: {e}")
+
+    scorer = build_scorer(
+        model, len(feature_columns),
+        backend=SCORING_BACKEND, onnx_path=onnx_path, onnx_threads=onnx_threads()
+    )
 
     print("Model loaded successfully")
-    print(f"Number of features: {len(app.state.feature_columns)}")
+    print(f"Number of features: {len(feature_columns)}")
+    print(f"Scoring backend: {scorer.name}")
+
+    # runs:/<run_id>/model -> run_id is the model version
+    parts = source.split("/")
+    version = parts[1] if source.startswith("runs:/") and len(parts) > 1 else source
+
+    return ModelVersion(
+        version,
+        scorer,
+        feature_columns,
+        FeatureAssembler(feature_columns, strict=STRICT_FEATURES, optional_features=OPTIONAL_FEATURES),
+        schema=FeatureSchema(feature_columns, OPTIONAL_FEATURES, strict=STRICT_FEATURES),
+        model=model,
+        source=source
+    )
+
+
+def preload_model():
+    global PRELOADED_MODEL
+    PRELOADED_MODEL = load_model_state()
+    return PRELOADED_MODEL
+
+
+def on_model_activate(old, new):
+    if old is not None and old is not new:
+        MODEL_ACTIVE.labels(old.version).set(0)
+        print(f"Model version {old.version} retired, draining {old.inflight} in-flight requests")
+    MODEL_ACTIVE.labels(new.version).set(1)
+    print(f"Model version {new.version} is now active")
+
+
+def on_model_free(mv):
+    if multiprocess_enabled():
+        # remove() doesn't reach the per-worker mmap files; 0 marks it retired instead
+        MODEL_ACTIVE.labels(mv.version).set(0)
+    else:
+        MODEL_ACTIVE.remove(mv.version)
+    print(f"Model version {mv.version} drained and released")
+
+
+def build_shadow(source, ab_percent, sample_rate):
+    """Load + warm a candidate model and wrap it in a started ShadowScorer (blocking)."""
+    candidate = load_model_state(source)
+    warm_up(candidate)
+    shadow = ShadowScorer(
+        candidate,
+        ab_percent=ab_percent,
+        sample_rate=sample_rate,
+        threshold=FRAUD_THRESHOLD,
+        metrics={
+            "scored": SHADOW_SCORED_TOTAL,
+            "dropped": SHADOW_DROPPED_TOTAL,
+            "flips": SHADOW_FLIPS_TOTAL,
+            "abs_diff": SHADOW_ABS_DIFF,
+            "mean_abs_diff": SHADOW_MEAN_ABS_DIFF,
+            "max_abs_diff": SHADOW_MAX_ABS_DIFF
+        }
+    )
+    shadow.start()
+    return shadow
+
+
+def set_shadow(shadow):
+    old, app.state.shadow = app.state.shadow, shadow
+    if old is not None:
+        old.stop()
+
+
+async def start_reload(source):
+    try:
+        await app.state.registry.reload(lambda: load_model_state(source))
+        MODEL_RELOADS_TOTAL.labels("success").inc()
+    except Exception as e:
+        MODEL_RELOADS_TOTAL.labels("failure").inc()
+        print(f"Model reload from {source} failed: {e}")
+
+
+async def watch_reload_file(path):
+    """Poll MODEL_RELOAD_FILE (e.g. a mounted ConfigMap) and reload when its contents change."""
+    last = None
+    while True:
+        try:
+            with open(path) as f:
+                source = f.read().strip()
+        except OSError:
+            source = None
+
+        if source and last is not None and source != last:
+            print(f"{path} changed, reloading model from {source}")
+            await start_reload(source)
+        if source:
+            last = source
+        await asyncio.sleep(MODEL_RELOAD_POLL_SECONDS)
+
+
+async def load_shadow(source, ab_percent, sample_rate):
+    try:
+        shadow = await asyncio.to_thread(build_shadow, source, ab_percent, sample_rate)
+        set_shadow(shadow)
+        print(f"Shadow candidate {shadow.candidate.version} active (A/B {shadow.ab_percent}%)")
+    except Exception as e:
+        print(f"Loading shadow candidate {source} failed: {e}")
+
+
+# -----------------------
+# ADMIN COMMANDS ACROSS PRE-FORK WORKERS
+# -----------------------
+
+def append_admin_command(action, **args):
+    # One O_APPEND write per command, so concurrent workers never interleave lines
+    line = orjson.dumps({"action": action, "args": args}) + b"\n"
+    fd = os.open(ADMIN_COMMAND_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+async def apply_admin_command(command):
+    action, args = command["action"], command["args"]
+    if action == "reload":
+        await start_reload(args["source"])
+    elif action == "set_shadow":
+        await load_shadow(args["source"], args["ab_percent"], args["sample_rate"])
+    elif action == "delete_shadow":
+        set_shadow(None)
+
+
+def current_admin_state(commands):
+    """A (re)started worker only needs the last reload and the last shadow change, in log order."""
+    latest = {}
+    for i, command in enumerate(commands):
+        latest["model" if command["action"] == "reload" else "shadow"] = (i, command)
+    return [command for _, command in sorted(latest.values(), key=lambda item: item[0])]
+
+
+async def follow_admin_commands(path):
+    """Tail ADMIN_COMMAND_LOG and apply each command in order in this worker."""
+    offset = 0
+    caught_up = False
+    while True:
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            data = b""
+        # Only whole lines; a partial write is picked up on the next poll
+        data = data[:data.rfind(b"\n") + 1]
+        offset += len(data)
+
+        commands = [orjson.loads(line) for line in data.splitlines() if line]
+        if not caught_up:
+            commands = current_admin_state(commands)
+            caught_up = True
+        for command in commands:
+            try:
+                await apply_admin_command(command)
+            except Exception as e:
+                print(f"Admin command {command} failed: {e}")
+        await asyncio.sleep(ADMIN_COMMAND_POLL_SECONDS)
+
+
+async def warm_up_serving(app: FastAPI):
+    """
+    Run synthetic batches through the scoring executor so every worker thread
+    pays its first-call costs (BLAS init, thread-local buffers, page faults on
+    the weights) before /ready reports ready.
+    """
+    start = time.perf_counter()
+    mv = app.state.registry.active
+    while True:
+        try:
+            # No deadline: first-call costs are exactly what can make warm-up slow
+            await asyncio.gather(*(
+                app.state.admission.run(
+                    warm_up, mv, WARMUP_BATCHES, WARMUP_BATCH_SIZE, kind="warm_up", enforce_deadline=False
+                )
+                for _ in range(SCORING_WORKERS)
+            ))
+            break
+        except Overloaded as e:
+            # Shed by early traffic: try again rather than report ready unwarmed
+            print(f"Warm-up shed ({e.reason}), retrying in {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            # The model can't score synthetic rows either; keep /ready failing
+            print(f"Warm-up failed, not marking ready: {e}")
+            return
+
+    warm_up_seconds = time.perf_counter() - start
+    STARTUP_PHASE_SECONDS.labels("warm_up").set(warm_up_seconds)
+    STARTUP_PHASE_SECONDS.labels("total").set(time.perf_counter() - IMPORT_START)
+    print(f"Warm-up finished in {warm_up_seconds:.3f}s")
+
+    app.state.ready = True
+    READY.set(1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    READY.set(0)
+    STARTUP_PHASE_SECONDS.labels("imports").set(IMPORTS_DONE - IMPORT_START)
+
+    # Single-process mode loads here; pre-fork workers reuse the parent's copy
+    load_start = time.perf_counter()
+    initial = PRELOADED_MODEL if PRELOADED_MODEL is not None else load_model_state()
+    STARTUP_PHASE_SECONDS.labels("model_load").set(time.perf_counter() - load_start)
+    app.state.registry = ModelRegistry(on_activate=on_model_activate, on_free=on_model_free)
+    app.state.registry.activate(initial)
+    app.state.reload_tasks = set()
+
+    app.state.admission = AdmissionController(
+        max_workers=SCORING_WORKERS,
+        max_queue=SCORING_MAX_QUEUE,
+        deadline_ms=REQUEST_DEADLINE_MS,
+        slo_ms=LATENCY_SLO_MS,
+        queue_depth_metric=SCORING_QUEUE_DEPTH,
+        shed_metric=SHED_REQUESTS_TOTAL
+    )
+
+    app.state.cache = None
+    if PREDICTION_CACHE_SIZE > 0:
+        app.state.cache = PredictionCache(
+            max_size=PREDICTION_CACHE_SIZE,
+            ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+            hit_metric=CACHE_HITS_TOTAL,
+            miss_metric=CACHE_MISSES_TOTAL,
+            eviction_metric=CACHE_EVICTIONS_TOTAL,
+            size_metric=CACHE_SIZE
+        )
+
+    app.state.batcher = None
+    if MICROBATCH_ENABLED:
+        app.state.batcher = MicroBatcher(
+            score_matrix,
+            max_batch_size=MICROBATCH_MAX_SIZE,
+            max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+            batch_size_metric=MICROBATCH_SIZE,
+            queue_wait_metric=MICROBATCH_QUEUE_WAIT,
+            run_fn=functools.partial(app.state.admission.run, kind="micro_batch"),
+            max_concurrent_flushes=SCORING_WORKERS
+        )
+        await app.state.batcher.start()
+        print(f"Micro-batching enabled (max_size={MICROBATCH_MAX_SIZE}, max_wait_ms={MICROBATCH_MAX_WAIT_MS})")
+
+    app.state.traffic_log = None
+    if TRAFFIC_LOG_DIR:
+        app.state.traffic_log = TrafficLogger(
+            TRAFFIC_LOG_DIR,
+            sample_rate=TRAFFIC_LOG_SAMPLE_RATE,
+            max_queue=TRAFFIC_LOG_MAX_QUEUE,
+            rotate_bytes=int(TRAFFIC_LOG_ROTATE_MB * 1024 * 1024),
+            rotate_seconds=TRAFFIC_LOG_ROTATE_SECONDS,
+            keep_files=TRAFFIC_LOG_KEEP_FILES,
+            metrics={
+                "logged": TRAFFIC_LOGGED_TOTAL,
+                "dropped": TRAFFIC_LOG_DROPPED_TOTAL,
+                "write_errors": TRAFFIC_LOG_WRITE_ERRORS_TOTAL,
+                "backlog": TRAFFIC_LOG_BACKLOG
+            }
+        )
+        app.state.traffic_log.start()
+        print(f"Traffic logging to {TRAFFIC_LOG_DIR} (sample rate {TRAFFIC_LOG_SAMPLE_RATE})")
+
+    app.state.drift = None
+    if DRIFT_BASELINE and os.path.exists(DRIFT_BASELINE):
+        app.state.drift = DriftMonitor(
+            load_drift_baseline(DRIFT_BASELINE),
+            sample_rate=DRIFT_SAMPLE_RATE,
+            publish_seconds=DRIFT_PUBLISH_SECONDS,
+            window_seconds=DRIFT_WINDOW_SECONDS,
+            min_rows=DRIFT_MIN_ROWS,
+            metrics={
+                "psi": FEATURE_PSI,
+                "mean_shift": FEATURE_MEAN_SHIFT,
+                "zero_rate_delta": FEATURE_ZERO_RATE_DELTA,
+                "max_psi": DRIFT_MAX_PSI,
+                "window_rows": DRIFT_WINDOW_ROWS,
+                "dropped": DRIFT_DROPPED_TOTAL
+            }
+        )
+        app.state.drift.start()
+        print(f"Drift monitoring against {DRIFT_BASELINE}")
+
+    app.state.shadow = None
+    if SHADOW_MODEL_SOURCE:
+        app.state.shadow = build_shadow(SHADOW_MODEL_SOURCE, AB_CANDIDATE_PERCENT, SHADOW_SAMPLE_RATE)
+        print(f"Shadow candidate {app.state.shadow.candidate.version} loaded (A/B {AB_CANDIDATE_PERCENT}%)")
+
+    app.state.binary_server = None
+    if BINARY_SOCKET_PATH or BINARY_TCP_PORT:
+        app.state.binary_server = BinaryScoringServer(
+            score_binary, binary_info, max_frame_bytes=BINARY_MAX_FRAME_BYTES, max_inflight=BINARY_MAX_INFLIGHT
+        )
+        if BINARY_SOCKET_PATH:
+            await app.state.binary_server.start_unix(BINARY_SOCKET_PATH)
+            print(f"Binary scoring protocol on unix:{BINARY_SOCKET_PATH}")
+        if BINARY_TCP_PORT:
+            await app.state.binary_server.start_tcp(BINARY_TCP_HOST, BINARY_TCP_PORT)
+            print(f"Binary scoring protocol on {BINARY_TCP_HOST}:{BINARY_TCP_PORT}")
+
+    reload_watcher = None
+    if MODEL_RELOAD_FILE:
+        reload_watcher = asyncio.create_task(watch_reload_file(MODEL_RELOAD_FILE))
+    command_follower = None
+    if ADMIN_COMMAND_LOG:
+        command_follower = asyncio.create_task(follow_admin_commands(ADMIN_COMMAND_LOG))
+
+    # Warm-up runs after startup so /health (liveness) answers right away
+    # while /ready (readiness) keeps traffic away until it finishes
+    warm_up_task = asyncio.create_task(warm_up_serving(app))
 
     yield  # App is running
 
     # Optional cleanup
+    app.state.ready = False
+    READY.set(0)
+    warm_up_task.cancel()
+    if reload_watcher is not None:
+        reload_watcher.cancel()
+    if command_follower is not None:
+        command_follower.cancel()
+    if app.state.binary_server is not None:
+        await app.state.binary_server.stop()
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
+    set_shadow(None)
+    if app.state.traffic_log is not None:
+        app.state.traffic_log.stop()
+    if app.state.drift is not None:
+        app.state.drift.stop()
+    app.state.admission.shutdown()
     print("Shutting down API")
     
 
@@ -100,16 +843,96 @@ app = FastAPI(
 	title="Fraud Detection API V1",
 	description= 'Real-Time fraud prediction using MLflow model',
 	version="1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Outermost timing: covers body read, validation and response send too
+app.add_middleware(ServerTimingMiddleware, histogram=SERVER_TIME)
+
+
+# -----------------------
+# LOAD SHEDDING RESPONSE
+# -----------------------
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 
 # -----------------------
 # REQUEST SCHEMA
 # -----------------------
 
 class PredictionRequest(BaseModel):
-    data: dict # key: feature name, value: feature value
+    # key: feature name, value: feature value. Docs only: /predict validates
+    # against the active model's compiled FeatureSchema (api/schema.py)
+    data: Dict[str, float]
+
+
+class PositionalPredictionRequest(BaseModel):
+    features: List[float] # values in GET /features order
+
+
+class BatchPredictionRequest(BaseModel):
+    # Either row-oriented: [{feature: value}, ...]
+    records: Optional[List[dict]] = None
+    # or column-oriented: {feature: [v0, v1, ...]}
+    columns: Optional[Dict[str, list]] = None
+    # or positional: [[v0, v1, ...], ...] in GET /features order
+    rows: Optional[List[List[float]]] = None
+
+    @model_validator(mode="after")
+    def check_one_layout(self):
+        layouts = [self.records, self.columns, self.rows]
+        if sum(layout is not None for layout in layouts) != 1:
+            raise ValueError("Provide exactly one of 'records', 'columns' or 'rows'")
+        return self
+
+
+def request_body_docs(*models, media_types=()):
+    """
+    OpenAPI requestBody for endpoints that read the raw body themselves
+    (needed for content negotiation), so /docs still shows the schemas.
+    """
+    schema = {"oneOf": [model.model_json_schema() for model in models]}
+    content = {codecs.JSON: {"schema": schema}}
+    for media_type in media_types:
+        content[media_type] = {"schema": {"type": "string", "format": "binary"}}
+    return {"requestBody": {"required": True, "content": content}}
+
+
+async def read_payload(request: Request, timer=NULL_TIMER):
+    """Decode the request body according to its Content-Type."""
+    body = await request.body()
+    timer.mark("read_body")
+    try:
+        payload = codecs.decode(body, request.headers.get("content-type"))
+    except codecs.UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except codecs.PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    timer.mark("decode")
+    return payload
+
+
+def validate_payload(model, payload):
+    # Same 422 response FastAPI gives when it validates the body itself
+    try:
+        return model.model_validate(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def validate_row(schema, payload):
+    try:
+        return schema.validate_row(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
     
 # -----------------------
 # HEALTH CHECK
@@ -119,14 +942,34 @@ class PredictionRequest(BaseModel):
 def health():
     return {"status": "ok"}
 
-# @app.get("/ready")
-# def ready():
-#     if model is None:
-#         return JSONResponse(
-#             status_code=503,
-#             content={"status": "model not loaded"}
-#         )
-#     return {"status": "ready"}
+
+# -----------------------
+# FEATURE SCHEMA (column order for positional payloads)
+# -----------------------
+
+@app.get("/features")
+def features():
+    mv = app.state.registry.active
+    return {
+        "model_version": mv.version,
+        "feature_columns": mv.feature_columns,
+        "n_features": len(mv.feature_columns),
+        # /predict may omit these; they default to 0.0
+        "optional_features": mv.schema.optional_features,
+        "media_types": {
+            "predict": codecs.supported_media_types(),
+            "predict_batch": codecs.supported_media_types(batch=True)
+        }
+    }
+
+@app.get("/ready")
+def ready():
+    if not app.state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming up"}
+        )
+    return {"status": "ready", "model_version": app.state.registry.active.version}
 
 
 # -----------------------
@@ -164,7 +1007,7 @@ def health():
 @app.get('/metrics')
 def metrics():
     return Response(
-		generate_latest(),
+		METRICS_EXPORTER.render(),
 		media_type=CONTENT_TYPE_LATEST
 	)
 
@@ -174,33 +1017,565 @@ def metrics():
 # Updated PREDICTION ENDPOINT -> with Prometheus metrics
 # -----------------------
 
-@app.post("/predict")
-def predict(request: PredictionRequest):
-    model = app.state.model
-    feature_columns = app.state.feature_columns
-    
-    start_time = time.time()
+def score_matrix(matrix, mv):
+    """Score an (n_rows x n_features) matrix already in mv.feature_columns order."""
+    return mv.scorer.predict(matrix)
+
+
+def observe_scored(matrix, probs, mv):
+    # Non-blocking hand-off of rows just scored to the traffic log, drift stats and the shadow candidate
+    traffic_log = app.state.traffic_log
+    if traffic_log is not None:
+        traffic_log.observe(matrix, probs, mv)
+    drift = app.state.drift
+    if drift is not None:
+        drift.observe(matrix, mv)
+    shadow = app.state.shadow
+    if shadow is not None:
+        shadow.observe(matrix, probs, mv)
+
+
+def route_ab(primary):
+    """A/B split: serve the candidate model for AB_CANDIDATE_PERCENT of requests."""
+    shadow = app.state.shadow
+    if shadow is not None and shadow.serve_candidate():
+        return shadow.candidate
+    return primary
+
+
+def predict_row(row, mv, timer=NULL_TIMER):
+    timer.mark("queue")
+    matrix = row.reshape(1, -1)
+    probs = score_matrix(matrix, mv)
+    timer.mark("score")
+    observe_scored(matrix, probs, mv)
+    return probs[0]
+
+
+async def score_single(row, mv, timer=NULL_TIMER):
+    """Score one assembled row via cache -> micro-batcher -> scoring executor."""
+    cache = app.state.cache
+    if app.state.shadow is not None and mv is app.state.shadow.candidate:
+        # Only the primary's scores are cached; A/B candidate traffic bypasses it
+        cache = None
+
+    if cache is not None:
+        key = cache.key(row)
+        cached = cache.get(key, mv.version)
+        timer.mark("cache_lookup")
+        if cached is not None:
+            if app.state.traffic_log is not None:
+                app.state.traffic_log.observe(row.reshape(1, -1), np.array([cached]), mv)
+            if app.state.drift is not None:
+                app.state.drift.observe(row.reshape(1, -1), mv)
+            return cached
+
+    if app.state.batcher is not None:
+        # Queue the row; it is scored together with concurrent requests on the same version
+        fraud_prob = float(await app.state.batcher.submit(row, mv))
+        timer.mark("batch_wait_and_score")
+        # Same (n_rows, n_features) / (n_rows,) shapes as every other caller
+        observe_scored(row.reshape(1, -1), np.array([fraud_prob]), mv)
+    else:
+        fraud_prob = float(await app.state.admission.run(predict_row, row, mv, timer, kind="row"))
+
+    if cache is not None:
+        cache.put(key, mv.version, fraud_prob)
+    return fraud_prob
+
+
+@app.post(
+    "/predict",
+    openapi_extra=request_body_docs(
+        PredictionRequest, PositionalPredictionRequest,
+        media_types=[codecs.MSGPACK]
+    )
+)
+async def predict(request: Request):
+    start_time = time.perf_counter()
+    timer = sampled_timer(STAGE_LATENCY, "predict", TIMING_SAMPLE_RATE)
     IN_PROGRESS.inc()
 
-    try:
-        input_df = pd.DataFrame([request.data])
-        input_df = input_df[feature_columns]
+    # Pin one model version for the whole request (hot reloads never swap it mid-flight)
+    with app.state.registry.acquire() as primary:
+        mv = route_ab(primary)
+        try:
+            payload = await read_payload(request, timer)
 
-        fraud_prob = model.predict_proba(input_df)[0][1]
+            if isinstance(payload, dict) and "features" in payload:
+                # Positional payload: already in feature_columns order
+                row = codecs.positional_matrix(payload["features"], len(mv.feature_columns))
+                if row.shape[0] != 1:
+                    raise FeatureError("/predict takes one row; use /predict/batch for more")
+                # Same rule as the schema path (allow_inf_nan=False): msgpack can carry NaN/inf
+                if not np.isfinite(row).all():
+                    raise FeatureError("Feature values must be finite numbers")
+                timer.mark("assemble")
+                fraud_prob = await score_single(row[0], mv, timer)
+            else:
+                # Compiled per-version schema: float coercion + feature checks in one pass (422 on bad input)
+                row = validate_row(mv.schema, payload)
+                timer.mark("validate")
+                fraud_prob = await score_single(row, mv, timer)
 
-        PREDICTIONS_TOTAL.inc() # “One more prediction request happened.” > You never decrease a counter.
-        return {
-            "fraud_probability": float(fraud_prob)
-        }
+            PREDICTIONS_TOTAL.labels("predict", mv.version).inc() # “One more prediction request happened.” > You never decrease a counter.
+            response = ORJSONResponse({
+                "fraud_probability": float(fraud_prob),
+                "model_version": mv.version
+            })
+            timer.mark("serialize")
+            return response
 
-    except Exception as e:
-        PREDICTION_ERRORS_TOTAL.inc()
+        except (Overloaded, RequestValidationError):
+            raise
+        except HTTPException:
+            PREDICTION_ERRORS_TOTAL.labels("predict", mv.version).inc()
+            raise
+        except FeatureError as e:
+            PREDICTION_ERRORS_TOTAL.labels("predict", mv.version).inc()
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+        except Exception as e:
+            PREDICTION_ERRORS_TOTAL.labels("predict", mv.version).inc()
+            raise HTTPException(
+                status_code=500,
+                detail=str(e)
+            )
+        
+        finally:
+            latency = time.perf_counter() - start_time
+            PREDICTION_LATENCY.labels("predict", mv.version).observe(latency)
+            IN_PROGRESS.dec()
+
+
+# -----------------------
+# BATCH PREDICTION ENDPOINT
+# -----------------------
+
+def assemble_columns(columns, feature_columns, optional_features=()):
+    """
+    Column-oriented variant: each feature arrives as one list, so most
+    columns convert with a single vectorized np.asarray call. Omitted
+    optional columns stay 0.0.
+    """
+    missing = [col for col in feature_columns if col not in columns and col not in optional_features]
+    if missing:
         raise HTTPException(
-            status_code=500,
-            detail=str(e)
+            status_code=400,
+            detail=f"Missing feature columns: {missing}"
         )
-    
+
+    present = [(j, col) for j, col in enumerate(feature_columns) if col in columns]
+    if not present:
+        # Every feature is optional and none was sent: nothing says how many rows there are
+        raise HTTPException(
+            status_code=400,
+            detail="No feature columns provided (see GET /features)"
+        )
+    lengths = {len(columns[col]) for _, col in present}
+    if len(lengths) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail="All feature columns must have the same length"
+        )
+
+    n_rows = lengths.pop()
+    matrix = np.zeros((n_rows, len(feature_columns)), dtype=np.float64)
+    errors = {}
+
+    for j, col in present:
+        values = columns[col]
+        try:
+            matrix[:, j] = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Slow path only for the column that has bad cells
+            for i, value in enumerate(values):
+                try:
+                    matrix[i, j] = value
+                except (TypeError, ValueError) as e:
+                    errors.setdefault(i, f"Invalid value for '{col}': {e}")
+
+    return matrix, errors
+
+
+def score_batch(assemble, mv, timer=NULL_TIMER):
+    """
+    Assemble and score one batch payload; runs on the scoring executor.
+    `assemble` is a zero-argument callable returning (matrix, {row: error}).
+    """
+    timer.mark("queue")
+    matrix, errors = assemble()
+    n_rows = matrix.shape[0]
+
+    # NaN/inf (e.g. null values) would make predict_proba fail for the whole batch
+    non_finite = np.flatnonzero(~np.isfinite(matrix).all(axis=1))
+    for i in non_finite:
+        errors.setdefault(int(i), "Feature values must be finite numbers")
+
+    valid = np.ones(n_rows, dtype=bool)
+    valid[list(errors)] = False
+
+    timer.mark("assemble")
+
+    probs = np.empty(n_rows, dtype=np.float64)
+    if valid.any():
+        # Single vectorized predict_proba call for every valid row
+        valid_matrix = matrix[valid]
+        probs[valid] = score_matrix(valid_matrix, mv)
+        timer.mark("score")
+        observe_scored(valid_matrix, probs[valid], mv)
+
+    results = []
+    for i in range(n_rows):
+        if valid[i]:
+            results.append({"fraud_probability": float(probs[i])})
+        else:
+            results.append({"fraud_probability": None, "error": errors[i]})
+    timer.mark("build_results")
+
+    return results, int(valid.sum())
+
+
+def check_batch_size(requested):
+    if requested > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {requested} rows exceeds MAX_BATCH_SIZE={MAX_BATCH_SIZE}"
+        )
+
+
+def batch_assembler(request: Request, body, payload, mv):
+    """Pick the assembly routine for a batch payload and report its row count."""
+    feature_columns = mv.feature_columns
+
+    if codecs.media_type(request.headers.get("content-type")) == codecs.ARROW_STREAM:
+        matrix = codecs.arrow_matrix(body, feature_columns)
+        return matrix.shape[0], lambda: (matrix, {})
+
+    if isinstance(payload, dict) and "rows" in payload and len(payload) == 1:
+        # Positional rows skip pydantic: one np.asarray call builds the matrix
+        rows = payload["rows"]
+        if not isinstance(rows, list):
+            raise FeatureError("'rows' must be a list of positional feature lists")
+        return len(rows), lambda: (codecs.positional_matrix(rows, len(feature_columns)), {})
+
+    if isinstance(payload, dict):
+        # Size from the raw payload, so an oversized batch is rejected before
+        # pydantic has walked every record
+        records, columns = payload.get("records"), payload.get("columns")
+        if isinstance(records, list):
+            check_batch_size(len(records))
+        elif isinstance(columns, dict):
+            check_batch_size(max((len(v) for v in columns.values() if isinstance(v, list)), default=0))
+
+    batch = validate_payload(BatchPredictionRequest, payload)
+    if batch.records is not None:
+        return len(batch.records), lambda: mv.assembler.assemble_many(batch.records)
+    requested = max((len(v) for v in batch.columns.values()), default=0)
+    return requested, lambda: assemble_columns(batch.columns, feature_columns, mv.schema.optional_features)
+
+
+@app.post(
+    "/predict/batch",
+    openapi_extra=request_body_docs(
+        BatchPredictionRequest,
+        media_types=[codecs.MSGPACK, codecs.ARROW_STREAM]
+    )
+)
+async def predict_batch(request: Request):
+    start_time = time.perf_counter()
+    timer = sampled_timer(STAGE_LATENCY, "predict_batch", TIMING_SAMPLE_RATE)
+    IN_PROGRESS.inc()
+    n_rows = 0
+
+    with app.state.registry.acquire() as primary:
+        mv = route_ab(primary)
+        try:
+            if codecs.media_type(request.headers.get("content-type")) == codecs.ARROW_STREAM:
+                body, payload = await request.body(), None
+                timer.mark("read_body")
+            else:
+                body, payload = None, await read_payload(request, timer)
+
+            requested, assemble = batch_assembler(request, body, payload, mv)
+            timer.mark("validate")
+            check_batch_size(requested)
+
+            results, n_scored = await app.state.admission.run(score_batch, assemble, mv, timer, kind="batch")
+            n_rows = len(results)
+
+            PREDICTIONS_TOTAL.labels("predict_batch", mv.version).inc(n_scored)
+            PREDICTION_ERRORS_TOTAL.labels("predict_batch", mv.version).inc(n_rows - n_scored)
+            BATCH_SIZE.observe(n_rows)
+
+            response = ORJSONResponse({
+                "results": results,
+                "n_scored": n_scored,
+                "n_errors": n_rows - n_scored,
+                "model_version": mv.version
+            })
+            timer.mark("serialize")
+            return response
+
+        except (Overloaded, RequestValidationError):
+            raise
+        except HTTPException:
+            PREDICTION_ERRORS_TOTAL.labels("predict_batch", mv.version).inc()
+            raise
+        except (FeatureError, codecs.PayloadError) as e:
+            PREDICTION_ERRORS_TOTAL.labels("predict_batch", mv.version).inc()
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+        except codecs.UnsupportedMediaType as e:
+            PREDICTION_ERRORS_TOTAL.labels("predict_batch", mv.version).inc()
+            raise HTTPException(
+                status_code=415,
+                detail=str(e)
+            )
+        except Exception as e:
+            PREDICTION_ERRORS_TOTAL.labels("predict_batch", mv.version).inc()
+            raise HTTPException(
+                status_code=500,
+                detail=str(e)
+            )
+
+        finally:
+            latency = time.perf_counter() - start_time
+            PREDICTION_LATENCY.labels("predict_batch", mv.version).observe(latency)
+            if n_rows:
+                BATCH_ROW_LATENCY.observe(latency / n_rows)
+            IN_PROGRESS.dec()
+
+
+# -----------------------
+# STREAMING ENDPOINT (NDJSON / CSV backfills)
+# -----------------------
+
+async def score_stream_chunk(records, mv):
+    """
+    Score one chunk on the scoring executor; when shed, wait and retry (up to
+    STREAM_MAX_RETRIES times) instead of failing the stream right away.
+    """
+    assemble = lambda: mv.assembler.assemble_many([record for _, record in records])
+    for attempt in range(STREAM_MAX_RETRIES + 1):
+        try:
+            return await app.state.admission.run(score_batch, assemble, mv, kind="stream")
+        except Overloaded as e:
+            if attempt == STREAM_MAX_RETRIES:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+
+async def stream_results(request: Request, fmt, body_read):
+    lines = streaming.iter_lines(
+        streaming.request_body(request, body_read),
+        STREAM_MAX_LINE_BYTES,
+        on_bytes=STREAM_BYTES_TOTAL.inc
+    )
+    STREAMS_IN_PROGRESS.inc()
+
+    try:
+        async for records, errors in streaming.iter_record_chunks(lines, fmt, STREAM_CHUNK_SIZE):
+            out = []
+            n_scored = 0
+
+            for line_number, message in errors:
+                out.append({"line": line_number, "fraud_probability": None, "error": message})
+
+            if records:
+                # Each chunk pins the version active when it is scored, so a
+                # long backfill picks up a hot reload at the next chunk
+                with app.state.registry.acquire() as mv:
+                    results, n_scored = await score_stream_chunk(records, mv)
+                for (line_number, _), result in zip(records, results):
+                    out.append({"line": line_number, "model_version": mv.version, **result})
+                STREAM_RECORDS_TOTAL.labels("scored").inc(n_scored)
+                PREDICTIONS_TOTAL.labels("predict_stream", mv.version).inc(n_scored)
+                STREAM_CHUNKS_TOTAL.inc()
+
+            STREAM_RECORDS_TOTAL.labels("error").inc(len(out) - n_scored)
+
+            # One write per chunk; the response waits for the client before pulling more
+            yield b"".join(orjson.dumps(item) + b"\n" for item in out)
+
+    except (streaming.StreamFormatError, Overloaded) as e:
+        # Status is already sent, so report the failure in-band as the last line
+        yield orjson.dumps({"error": str(e)}) + b"\n"
     finally:
-        latency = time.time() - start_time
-        PREDICTION_LATENCY.observe(latency)
-        IN_PROGRESS.dec()
+        STREAMS_IN_PROGRESS.dec()
+
+
+@app.post(
+    "/predict/stream",
+    openapi_extra={"requestBody": {"required": True, "content": {
+        streaming.NDJSON: {"schema": {"type": "string", "format": "binary"}},
+        streaming.CSV: {"schema": {"type": "string", "format": "binary"}}
+    }}}
+)
+async def predict_stream(request: Request):
+    fmt = codecs.media_type(request.headers.get("content-type"))
+    if fmt not in (streaming.NDJSON, streaming.CSV):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Use Content-Type {streaming.NDJSON} or {streaming.CSV}"
+        )
+
+    # Not StreamingResponse: its disconnect listener would eat the request body we are still reading
+    body_read = asyncio.Event()
+    return streaming.BodyStreamingResponse(
+        stream_results(request, fmt, body_read), body_read, media_type=streaming.NDJSON
+    )
+
+
+# -----------------------
+# BINARY PROTOCOL (Unix socket / local TCP, same model + metrics as HTTP)
+# -----------------------
+
+def score_rows(matrix, mv):
+    probs = score_matrix(matrix, mv)
+    observe_scored(matrix, probs, mv)
+    return probs
+
+
+async def score_binary(matrix):
+    """BinaryScoringServer score_fn: (float64 matrix in feature_columns order) -> (probs, version)."""
+    if not app.state.ready:
+        # No readiness probe gates this listener, so refuse until warm-up is done
+        raise Overloaded(503, "warming_up", 1)
+
+    start_time = time.perf_counter()
+    IN_PROGRESS.inc()
+
+    with app.state.registry.acquire() as primary:
+        mv = route_ab(primary)
+        try:
+            if matrix.shape[1] != len(mv.feature_columns):
+                raise FeatureError(
+                    f"Expected {len(mv.feature_columns)} features in GET /features order, got {matrix.shape[1]}"
+                )
+            if not np.isfinite(matrix).all():
+                raise FeatureError("Feature values must be finite numbers")
+
+            if len(matrix) == 1:
+                # Same path as /predict: cache -> micro-batcher -> scoring executor
+                probs = [await score_single(matrix[0], mv)]
+            elif len(matrix) == 0:
+                probs = []
+            else:
+                probs = await app.state.admission.run(score_rows, matrix, mv, kind="binary")
+
+            PREDICTIONS_TOTAL.labels("binary", mv.version).inc(len(matrix))
+            return probs, mv.version
+
+        except Overloaded:
+            raise
+        except Exception:
+            PREDICTION_ERRORS_TOTAL.labels("binary", mv.version).inc()
+            raise
+
+        finally:
+            PREDICTION_LATENCY.labels("binary", mv.version).observe(time.perf_counter() - start_time)
+            IN_PROGRESS.dec()
+
+
+def binary_info():
+    mv = app.state.registry.active
+    return {"model_version": mv.version, "feature_columns": mv.feature_columns}
+
+
+# -----------------------
+# ADMIN: HOT MODEL RELOAD
+# -----------------------
+
+class ReloadRequest(BaseModel):
+    # Serving artifact dir, "runs:/<run_id>/model" or a bare run id
+    source: str
+
+
+def check_admin(request: Request):
+    # Fail closed: no token configured means nobody can call the admin API
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (ADMIN_TOKEN not set)")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def run_admin_command(action, **args):
+    """Apply here (single process) or broadcast to every pre-fork worker via ADMIN_COMMAND_LOG."""
+    if ADMIN_COMMAND_LOG:
+        append_admin_command(action, **args)
+        return
+    task = asyncio.create_task(apply_admin_command({"action": action, "args": args}))
+    app.state.reload_tasks.add(task)
+    task.add_done_callback(app.state.reload_tasks.discard)
+
+
+@app.post("/admin/reload", status_code=202)
+async def admin_reload(reload_request: ReloadRequest, request: Request):
+    check_admin(request)
+    if app.state.registry.reloading:
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+
+    # Load + warm-up run in the background (in every worker); /admin/models shows progress
+    run_admin_command("reload", source=reload_request.source)
+    return {"status": "reloading", "source": reload_request.source}
+
+
+@app.get("/admin/models")
+def admin_models(request: Request):
+    check_admin(request)
+    # Per process: in pre-fork mode workers converge within ADMIN_COMMAND_POLL_SECONDS
+    return {**app.state.registry.describe(), "worker_pid": os.getpid()}
+
+
+@app.get("/admin/drift")
+def admin_drift(request: Request):
+    check_admin(request)
+    if app.state.drift is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is not enabled")
+    return app.state.drift.describe()
+
+
+# -----------------------
+# ADMIN: SHADOW / A-B CANDIDATE
+# -----------------------
+
+class ShadowRequest(BaseModel):
+    source: str # serving artifact dir, "runs:/<run_id>/model" or run id
+    ab_percent: float = 0.0 # share of traffic served by the candidate
+    sample_rate: float = 1.0 # share of primary traffic shadow-scored
+
+
+@app.post("/admin/shadow", status_code=202)
+async def admin_set_shadow(shadow_request: ShadowRequest, request: Request):
+    check_admin(request)
+    if not 0 <= shadow_request.ab_percent <= 100:
+        raise HTTPException(status_code=422, detail="ab_percent must be between 0 and 100")
+
+    run_admin_command(
+        "set_shadow",
+        source=shadow_request.source,
+        ab_percent=shadow_request.ab_percent,
+        sample_rate=shadow_request.sample_rate
+    )
+    return {"status": "loading", "source": shadow_request.source}
+
+
+@app.get("/admin/shadow")
+def admin_get_shadow(request: Request):
+    check_admin(request)
+    shadow = app.state.shadow
+    described = shadow.describe() if shadow is not None else {"candidate_version": None}
+    return {**described, "worker_pid": os.getpid()}
+
+
+@app.delete("/admin/shadow")
+async def admin_delete_shadow(request: Request):
+    check_admin(request)
+    run_admin_command("delete_shadow")
+    return {"status": "disabled"}
@@ -0,0 +1,59 @@
+# /metrics rendering for single- and multi-process deployments
+#
+# Single process: the default registry, exactly as before.
+# Multiple workers (api/serve.py or uvicorn --workers): set
+# PROMETHEUS_MULTIPROC_DIR before anything imports prometheus_client. Every
+# worker then writes its metric values to mmap-backed files in that directory
+# and a scrape merges them with MultiProcessCollector, using each Gauge's
+# multiprocess_mode to decide how per-worker values combine.
+#
+# Merging reads every worker's files, so the rendered output is cached for a
+# short window: concurrent or back-to-back scrapes (several Prometheus
+# replicas, the HPA adapter) share one merge instead of each paying for it.
+
+import os
+import threading
+import time
+
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client import multiprocess
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+class MetricsExporter:
+    def __init__(self, cache_seconds=1.0):
+        self.cache_seconds = cache_seconds
+        self._lock = threading.Lock()
+        self._rendered = None
+        self._rendered_at = 0.0
+
+    def _render(self):
+        if not multiprocess_enabled():
+            return generate_latest()
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+    def render(self):
+        if self.cache_seconds <= 0:
+            return self._render()
+
+        # One thread renders; others arriving meanwhile wait and reuse the result
+        with self._lock:
+            now = time.monotonic()
+            if self._rendered is None or now - self._rendered_at >= self.cache_seconds:
+                self._rendered = self._render()
+                self._rendered_at = now
+            return self._rendered
+
+
+def mark_worker_dead(pid):
+    """Drop a dead worker's live-gauge files so they stop counting toward live* merges."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
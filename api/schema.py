@@ -0,0 +1,51 @@
+# /predict request schema compiled from the model's feature names
+#
+# Instead of `data: dict`, each loaded model version gets a pydantic model with
+# one float field per feature (aliased to the feature name, in feature_columns
+# order). pydantic-core then coerces every value to float in a single pass and
+# reports missing / non-numeric / non-finite / unexpected features as a 422
+# with the offending feature names, before any assembly or scoring work.
+#
+# Features listed as optional default to 0.0, the value feature engineering
+# fills missing values with (fillna(0)), so a client may omit them.
+
+import numpy as np
+from pydantic import ConfigDict, Field, create_model
+
+
+class FeatureSchema:
+    def __init__(self, feature_columns, optional_features=(), strict=False):
+        self.feature_columns = tuple(feature_columns)
+        self.n_features = len(self.feature_columns)
+
+        optional = set(self.feature_columns) if optional_features == "*" else set(optional_features)
+        self.optional_features = tuple(col for col in self.feature_columns if col in optional)
+        self.required_features = tuple(col for col in self.feature_columns if col not in optional)
+
+        # Positional field names: feature names may clash with BaseModel attributes
+        fields = {}
+        for i, col in enumerate(self.feature_columns):
+            default = 0.0 if col in optional else ...
+            fields[f"f{i}"] = (float, Field(default, alias=col))
+
+        self.features_model = create_model(
+            "Features",
+            __config__=ConfigDict(
+                extra="forbid" if strict else "ignore",
+                allow_inf_nan=False,
+            ),
+            **fields
+        )
+        self.request_model = create_model(
+            "PredictionRequest",
+            data=(self.features_model, ...)
+        )
+
+    def validate_row(self, payload):
+        """Validate a {"data": {...}} payload into a 1-D float64 row; raises pydantic.ValidationError."""
+        features = self.request_model.model_validate(payload).data
+        # Fields are stored in declaration order, i.e. feature_columns order
+        return np.fromiter(features.__dict__.values(), dtype=np.float64, count=self.n_features)
+
+    def json_schema(self):
+        return self.request_model.model_json_schema(by_alias=True)
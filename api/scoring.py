@@ -0,0 +1,145 @@
+# Scoring backends
+#
+# A scorer turns an (n_rows x n_features) float64 matrix, already in
+# feature_columns order, into n_rows fraud probabilities.
+#
+# LinearScorer is a native NumPy kernel for binary linear models
+# (LogisticRegression): one mat-vec product plus a sigmoid, skipping sklearn's
+# per-call validation, feature-name checks and copies. Anything it doesn't
+# support falls back to SklearnScorer, which just calls predict_proba.
+#
+# OnnxScorer runs the model.onnx graph exported at training time with
+# onnxruntime on CPU, for model families without a native kernel. onnxruntime
+# is optional and only imported when that backend is selected.
+
+import numpy as np
+from scipy.special import expit
+
+
+class SklearnScorer:
+    name = "sklearn"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, matrix):
+        return self.model.predict_proba(matrix)[:, 1]
+
+
+class LinearScorer:
+    name = "linear"
+
+    def __init__(self, coef, intercept):
+        # Contiguous float64 copies so the kernel never re-layouts per call
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64).reshape(-1)
+        self.intercept = float(np.asarray(intercept, dtype=np.float64).reshape(-1)[0])
+
+    def decision_function(self, matrix):
+        return matrix @ self.coef + self.intercept
+
+    def predict(self, matrix):
+        # expit is what sklearn's LogisticRegression.predict_proba uses for binary problems
+        return expit(self.decision_function(matrix))
+
+
+class OnnxScorer:
+    name = "onnx"
+
+    def __init__(self, path, intra_op_threads=1):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # Requests are already spread over the scoring executor's threads, so each
+        # run gets a slice of the CPU budget and ops run one after another
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float32 if model_input.type == "tensor(float)" else np.float64
+        # skl2onnx classifiers output (label, probabilities); zipmap is disabled at export
+        outputs = [o.name for o in self.session.get_outputs()]
+        self.output_name = "probabilities" if "probabilities" in outputs else outputs[-1]
+
+    def predict(self, matrix):
+        matrix = np.asarray(matrix, dtype=self.input_dtype)
+        return self.session.run([self.output_name], {self.input_name: matrix})[0][:, 1]
+
+
+# -----------------------
+# DETECTION
+# -----------------------
+
+# Estimators whose positive-class probability is exactly expit(X @ coef_ + intercept_)
+SUPPORTED_LINEAR_MODELS = ("LogisticRegression", "LogisticRegressionCV")
+
+PARITY_ATOL = 1e-9
+# Graph ops may reorder the float math, so ONNX is held to a looser bound
+ONNX_PARITY_ATOL = 1e-6
+
+BACKENDS = ("auto", "linear", "sklearn", "onnx")
+
+
+def linear_scorer_from_model(model):
+    """Return a LinearScorer for a supported binary linear model, else None."""
+    if type(model).__name__ not in SUPPORTED_LINEAR_MODELS:
+        return None
+
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    classes = getattr(model, "classes_", None)
+    if coef is None or intercept is None or classes is None:
+        return None
+
+    # Multinomial / multi-class models need softmax, not the binary kernel
+    if len(classes) != 2 or coef.shape[0] != 1:
+        return None
+
+    return LinearScorer(coef, intercept)
+
+
+def check_parity(scorer, model, n_features, n_rows=64, seed=0):
+    """Max absolute difference between scorer and model.predict_proba on synthetic rows."""
+    rng = np.random.default_rng(seed)
+    matrix = np.vstack([
+        np.zeros((1, n_features)),
+        np.ones((1, n_features)),
+        rng.normal(scale=10.0, size=(n_rows, n_features)),
+    ])
+    expected = model.predict_proba(matrix)[:, 1]
+    return float(np.max(np.abs(scorer.predict(matrix) - expected)))
+
+
+def build_scorer(model, n_features, backend="auto", onnx_path=None, onnx_threads=1):
+    """
+    Pick the scorer for `backend`; "auto" is the fastest one that reproduces
+    model.predict_proba. The native kernel is only used if it matches sklearn
+    within PARITY_ATOL, the ONNX graph within ONNX_PARITY_ATOL.
+    """
+    if backend == "sklearn":
+        return SklearnScorer(model)
+
+    if backend == "onnx":
+        try:
+            scorer = OnnxScorer(onnx_path, onnx_threads)
+        except Exception as e:
+            print(f"ONNX backend unavailable ({e}), falling back")
+        else:
+            max_diff = check_parity(scorer, model, n_features)
+            if max_diff <= ONNX_PARITY_ATOL:
+                return scorer
+            print(f"ONNX parity check failed (max diff {max_diff:.2e}), falling back")
+
+    scorer = linear_scorer_from_model(model)
+    if scorer is not None:
+        max_diff = check_parity(scorer, model, n_features)
+        if max_diff <= PARITY_ATOL:
+            return scorer
+        print(f"Linear kernel parity check failed (max diff {max_diff:.2e}), using sklearn")
+
+    return SklearnScorer(model)
@@ -0,0 +1,268 @@
+# Pre-fork multi-worker server -> python -m api.serve --port 8000
+#
+# The parent process loads the model once (api.main.preload_model), freezes
+# the GC so refcount/GC bookkeeping doesn't dirty those pages, binds the
+# listening socket and then forks N uvicorn workers. Workers share the model's
+# memory copy-on-write and all accept() on the same socket.
+#
+# The parent supervises the workers:
+#   - a worker that exits is restarted (with backoff if it keeps crashing)
+#   - each worker stamps a heartbeat slot in shared memory from its event loop;
+#     a worker whose loop stops ticking for HEARTBEAT_TIMEOUT seconds is killed
+#     and restarted
+#
+# With more than one worker, Prometheus metrics go to mmap-backed files in
+# PROMETHEUS_MULTIPROC_DIR (default /tmp/fraud-api-metrics), which /metrics
+# merges across workers. The directory is set up before prometheus_client is
+# first imported, which is when it picks its storage backend.
+#
+# Admin commands (/admin/reload, /admin/shadow) reach whichever worker accepts
+# the request, so with more than one worker they are appended to a shared log
+# (ADMIN_COMMAND_LOG) that every worker tails and applies; a restarted worker
+# replays the latest reload and shadow change from it.
+#
+# The single-process path (uvicorn api.main:app) is unchanged: without a
+# preloaded model, lifespan() loads the model itself.
+
+import argparse
+import asyncio
+import gc
+import math
+import mmap
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+from api.cpu import cpu_limit
+
+# One BLAS/OpenMP thread per worker: parallelism comes from processes, and
+# thread pools must not exist in the parent before fork.
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+HEARTBEAT_INTERVAL = float(os.getenv("HEARTBEAT_INTERVAL", "1"))
+HEARTBEAT_TIMEOUT = float(os.getenv("HEARTBEAT_TIMEOUT", "30"))
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "20"))
+DEFAULT_METRICS_DIR = "/tmp/fraud-api-metrics"
+DEFAULT_ADMIN_COMMAND_LOG = "/tmp/fraud-api-admin-commands.ndjson"
+
+
+# -----------------------
+# WORKER COUNT
+# -----------------------
+
+def default_workers():
+    if os.getenv("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    return max(1, math.ceil(cpu_limit()))
+
+
+def prepare_metrics_dir(path):
+    """Create/empty the shared metrics dir and export it. Must run before prometheus_client is imported."""
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+
+def prepare_admin_command_log(path):
+    """Start an empty shared admin log and export it. Must run before api.main is imported."""
+    open(path, "wb").close()
+    os.environ["ADMIN_COMMAND_LOG"] = path
+
+
+# -----------------------
+# WORKER PROCESS
+# -----------------------
+
+class Heartbeats:
+    """One float64 monotonic timestamp per worker slot in anonymous shared memory."""
+
+    def __init__(self, n_slots):
+        self._buf = mmap.mmap(-1, 8 * n_slots)
+
+    def beat(self, slot):
+        struct.pack_into("d", self._buf, 8 * slot, time.monotonic())
+
+    def last(self, slot):
+        return struct.unpack_from("d", self._buf, 8 * slot)[0]
+
+
+async def _heartbeat_loop(heartbeats, slot):
+    while True:
+        heartbeats.beat(slot)
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+def run_worker(app, sock, slot, heartbeats, log_level):
+    import uvicorn
+
+    # Undo the supervisor's handlers; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, lifespan="on", log_level=log_level)
+    server = uvicorn.Server(config)
+
+    async def serve():
+        heartbeat = asyncio.create_task(_heartbeat_loop(heartbeats, slot))
+        try:
+            await server.serve(sockets=[sock])
+        finally:
+            heartbeat.cancel()
+
+    asyncio.run(serve())
+
+
+# -----------------------
+# SUPERVISOR
+# -----------------------
+
+class Supervisor:
+    def __init__(self, app, sock, n_workers, log_level):
+        self.app = app
+        self.sock = sock
+        self.n_workers = n_workers
+        self.log_level = log_level
+        self.heartbeats = Heartbeats(n_workers)
+
+        self.workers = {}  # pid -> slot
+        self.started_at = {}  # slot -> monotonic start time
+        self.crashes = [0] * n_workers
+        self.stopping = False
+
+    def spawn(self, slot):
+        # Parent stamps the slot so a fresh worker isn't treated as hung
+        self.heartbeats.beat(slot)
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                run_worker(self.app, self.sock, slot, self.heartbeats, self.log_level)
+            except BaseException as e:
+                print(f"[worker {slot}] crashed: {e!r}", file=sys.stderr)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self.workers[pid] = slot
+        self.started_at[slot] = time.monotonic()
+        print(f"[supervisor] started worker {slot} (pid {pid})")
+
+    def handle_signal(self, signum, frame):
+        self.stopping = True
+
+    def reap(self):
+        # Imported here: prometheus_client must not load before prepare_metrics_dir()
+        from api.metrics_export import mark_worker_dead
+
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            mark_worker_dead(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+
+            # Back off if the worker keeps dying right after start (crash loop)
+            if time.monotonic() - self.started_at[slot] < 5:
+                self.crashes[slot] += 1
+            else:
+                self.crashes[slot] = 0
+            delay = min(2 ** self.crashes[slot] - 1, 30)
+            print(f"[supervisor] worker {slot} (pid {pid}) exited with {code}; restarting in {delay}s")
+            time.sleep(delay)
+            self.spawn(slot)
+
+    def check_heartbeats(self):
+        now = time.monotonic()
+        for pid, slot in list(self.workers.items()):
+            if now - self.heartbeats.last(slot) > HEARTBEAT_TIMEOUT:
+                print(f"[supervisor] worker {slot} (pid {pid}) missed heartbeats; killing")
+                os.kill(pid, signal.SIGKILL)
+
+    def shutdown(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+        while self.workers:
+            pid, _ = os.waitpid(-1, 0)
+            self.workers.pop(pid, None)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+        for slot in range(self.n_workers):
+            self.spawn(slot)
+
+        while not self.stopping:
+            self.reap()
+            self.check_heartbeats()
+            time.sleep(0.5)
+
+        print("[supervisor] shutting down workers")
+        self.shutdown()
+
+
+# -----------------------
+# ENTRYPOINT
+# -----------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork Fraud Detection API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.workers > 1 or os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        prepare_metrics_dir(os.getenv("PROMETHEUS_MULTIPROC_DIR", DEFAULT_METRICS_DIR))
+    if args.workers > 1:
+        # /admin/reload and /admin/shadow reach one worker; the log fans them out to all
+        prepare_admin_command_log(os.getenv("ADMIN_COMMAND_LOG", DEFAULT_ADMIN_COMMAND_LOG))
+
+    from api import main as api_main
+
+    # Load once in the parent; workers inherit it copy-on-write
+    api_main.preload_model()
+
+    # Importing api.main created the parent's own live-gauge files (api_ready = 0
+    # would pin the livemin merge at 0 forever); the parent never serves, so drop them
+    from api.metrics_export import mark_worker_dead
+    mark_worker_dead(os.getpid())
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    print(f"[supervisor] serving on {args.host}:{args.port} with {args.workers} workers")
+    Supervisor(api_main.app, sock, args.workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
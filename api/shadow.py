@@ -0,0 +1,163 @@
+# Shadow scoring and A/B serving of a candidate model
+#
+# Shadow: after the primary model answers, the already-assembled feature rows
+# and primary probabilities are pushed (non-blocking) onto a bounded queue. A
+# background thread drains it in batches, scores them with the candidate in one
+# vectorized call and aggregates primary-vs-candidate divergence. The request
+# path only pays for a queue put; if the queue is full the rows are dropped.
+#
+# A/B: with ab_percent > 0, that share of requests is served by the candidate
+# instead of the primary (no shadow comparison for those).
+
+import queue
+import random
+import threading
+
+import numpy as np
+
+
+class ShadowScorer:
+    def __init__(
+        self,
+        candidate,
+        ab_percent=0.0,
+        sample_rate=1.0,
+        threshold=0.5,
+        max_queue=1024,
+        max_batch_rows=4096,
+        metrics=None,
+    ):
+        self.candidate = candidate
+        self.ab_percent = ab_percent
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.max_batch_rows = max_batch_rows
+        # dict with optional keys: scored, dropped, flips, abs_diff, mean_abs_diff, max_abs_diff
+        self.metrics = metrics or {}
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # In-memory divergence aggregates (read by /admin/shadow)
+        self._lock = threading.Lock()
+        self.n_compared = 0
+        self.sum_abs_diff = 0.0
+        self.sum_diff = 0.0
+        self.max_abs_diff = 0.0
+        self.n_flips = 0
+
+    # -----------------------
+    # LIFECYCLE
+    # -----------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # -----------------------
+    # REQUEST PATH
+    # -----------------------
+
+    def serve_candidate(self):
+        """A/B split: True if this request should be answered by the candidate."""
+        return self.ab_percent > 0 and random.random() * 100 < self.ab_percent
+
+    def observe(self, matrix, primary_probs, mv):
+        """Queue rows the primary just scored for shadow comparison. Never blocks."""
+        if mv is self.candidate or len(matrix) == 0:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        # Feature order must match for the same vector to be valid for both models
+        if mv.feature_columns != self.candidate.feature_columns:
+            return
+        try:
+            # Copy: callers may reuse their buffers (thread-local assembly rows)
+            self._queue.put_nowait((np.array(matrix, dtype=np.float64, ndmin=2), np.array(primary_probs, ndmin=1)))
+        except queue.Full:
+            self._inc("dropped", len(matrix))
+
+    # -----------------------
+    # BACKGROUND WORKER
+    # -----------------------
+
+    def _inc(self, name, amount=1):
+        metric = self.metrics.get(name)
+        if metric is not None:
+            metric.inc(amount)
+
+    def _drain(self):
+        try:
+            items = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        n_rows = len(items[0][0])
+        while n_rows < self.max_batch_rows:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    def _run(self):
+        while not self._stop.is_set():
+            items = self._drain()
+            if not items:
+                continue
+
+            matrix = np.vstack([m for m, _ in items])
+            primary = np.concatenate([p for _, p in items])
+            try:
+                shadow = self.candidate.scorer.predict(matrix)
+            except Exception as e:
+                print(f"Shadow scoring failed: {e}")
+                continue
+
+            self._record(primary, shadow)
+
+    def _record(self, primary, shadow):
+        diff = shadow - primary
+        abs_diff = np.abs(diff)
+        flips = int(np.count_nonzero((primary >= self.threshold) != (shadow >= self.threshold)))
+
+        with self._lock:
+            self.n_compared += len(diff)
+            self.sum_abs_diff += float(abs_diff.sum())
+            self.sum_diff += float(diff.sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(abs_diff.max()))
+            self.n_flips += flips
+            mean_abs = self.sum_abs_diff / self.n_compared
+            max_abs = self.max_abs_diff
+
+        self._inc("scored", len(diff))
+        self._inc("flips", flips)
+        if "abs_diff" in self.metrics:
+            for value in abs_diff:
+                self.metrics["abs_diff"].observe(value)
+        if "mean_abs_diff" in self.metrics:
+            self.metrics["mean_abs_diff"].set(mean_abs)
+        if "max_abs_diff" in self.metrics:
+            self.metrics["max_abs_diff"].set(max_abs)
+
+    def describe(self):
+        with self._lock:
+            n = self.n_compared
+            return {
+                "candidate_version": self.candidate.version,
+                "ab_percent": self.ab_percent,
+                "sample_rate": self.sample_rate,
+                "compared": n,
+                "mean_abs_diff": self.sum_abs_diff / n if n else None,
+                "mean_diff": self.sum_diff / n if n else None,
+                "max_abs_diff": self.max_abs_diff if n else None,
+                "decision_flip_rate": self.n_flips / n if n else None,
+                "queue_backlog": self._queue.qsize()
+            }
@@ -0,0 +1,136 @@
+# Incremental parsing for the streaming scoring endpoint
+#
+# The request body is consumed chunk by chunk (request.stream()), split into
+# lines and grouped into fixed-size record chunks. Nothing holds more than one
+# chunk of records plus one partial line, so memory stays flat no matter how
+# large the upload is. Because records are pulled only when the response
+# generator asks for the next chunk, a slow reader on either side stalls the
+# whole pipeline instead of buffering (backpressure in both directions).
+#
+# The response is sent with BodyStreamingResponse: Starlette's
+# StreamingResponse listens for http.disconnect from the first byte, and that
+# listener swallows the http.request body messages the generator still needs.
+
+import csv
+
+import anyio
+import orjson
+from starlette.responses import StreamingResponse
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+
+class StreamFormatError(ValueError):
+    """Body can't be parsed as a stream of records at all (e.g. bad CSV header)."""
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for a generator that is still reading the request body.
+    receive() belongs to the generator until `body_read` is set (request.stream()
+    raises ClientDisconnect by itself meanwhile); only then does the response
+    listen for the client going away.
+    """
+
+    def __init__(self, content, body_read, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def __call__(self, scope, receive, send):
+        async with anyio.create_task_group() as task_group:
+            async def stream():
+                await self.stream_response(send)
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(stream)
+            await self.body_read.wait()
+            await self.listen_for_disconnect(receive)
+            task_group.cancel_scope.cancel()
+
+        if self.background is not None:
+            await self.background()
+
+
+async def request_body(request, body_read):
+    """request.stream(), setting `body_read` once the body is exhausted (or reading failed)."""
+    try:
+        async for data in request.stream():
+            yield data
+    finally:
+        body_read.set()
+
+
+async def iter_lines(byte_chunks, max_line_bytes, on_bytes=None):
+    """Yield complete lines (without the trailing newline) from an async byte stream."""
+    buffer = bytearray()
+    async for data in byte_chunks:
+        if on_bytes is not None:
+            on_bytes(len(data))
+        buffer.extend(data)
+
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            yield bytes(buffer[start:end]).rstrip(b"\r")
+            start = end + 1
+        del buffer[:start]
+
+        if len(buffer) > max_line_bytes:
+            raise StreamFormatError(f"Line longer than {max_line_bytes} bytes")
+
+    if buffer.strip():
+        yield bytes(buffer).rstrip(b"\r")
+
+
+async def iter_record_chunks(lines, fmt, chunk_size):
+    """
+    Group lines into chunks of up to chunk_size parsed records.
+
+    Yields (records, errors) where records is a list of (line_number, dict)
+    and errors is a list of (line_number, message) for unparseable lines.
+    """
+    header = None
+    records, errors = [], []
+    line_number = 0
+
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if fmt == CSV:
+            try:
+                values = next(csv.reader([line.decode("utf-8")]))
+            except (UnicodeDecodeError, csv.Error) as e:
+                errors.append((line_number, f"Invalid CSV line: {e}"))
+                continue
+            if header is None:
+                header = values
+                continue
+            if len(values) != len(header):
+                errors.append((line_number, f"Expected {len(header)} fields, got {len(values)}"))
+                continue
+            records.append((line_number, dict(zip(header, values))))
+        else:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                errors.append((line_number, f"Invalid JSON: {e}"))
+                continue
+            if not isinstance(record, dict):
+                errors.append((line_number, "Each line must be a JSON object of features"))
+                continue
+            records.append((line_number, record))
+
+        if len(records) + len(errors) >= chunk_size:
+            yield records, errors
+            records, errors = [], []
+
+    if fmt == CSV and header is None and line_number:
+        raise StreamFormatError("CSV stream has no header row")
+
+    if records or errors:
+        yield records, errors
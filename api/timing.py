@@ -0,0 +1,79 @@
+# Per-stage latency instrumentation for the scoring pipeline
+#
+# StageTimer records perf_counter_ns() deltas between consecutive mark() calls
+# into a labeled histogram (endpoint, stage), so a p99 regression can be pinned
+# on parsing, validation, assembly, queueing, scoring or serialization.
+# Only a sampled share of requests get a real timer; the rest get NULL_TIMER,
+# whose mark() is a no-op, keeping the instrumentation overhead small.
+#
+# ServerTimingMiddleware is a plain ASGI middleware measuring end-to-end server
+# time per route, including the body read, validation and response send that
+# happen outside the endpoint function.
+
+import random
+import time
+
+# Sub-millisecond resolution: most stages take microseconds
+STAGE_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+
+class StageTimer:
+    __slots__ = ("histogram", "endpoint", "last")
+
+    def __init__(self, histogram, endpoint):
+        self.histogram = histogram
+        self.endpoint = endpoint
+        self.last = time.perf_counter_ns()
+
+    def mark(self, stage):
+        now = time.perf_counter_ns()
+        self.histogram.labels(self.endpoint, stage).observe((now - self.last) / 1e9)
+        self.last = now
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def sampled_timer(histogram, endpoint, sample_rate):
+    """A real StageTimer for `sample_rate` of calls, NULL_TIMER otherwise."""
+    if sample_rate >= 1.0 or (sample_rate > 0 and random.random() < sample_rate):
+        return StageTimer(histogram, endpoint)
+    return NULL_TIMER
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app, histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            # Route template (e.g. "/predict"), not the raw path, to bound label cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.histogram.labels(scope["method"], route, str(status)).observe(elapsed)
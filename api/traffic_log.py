@@ -0,0 +1,190 @@
+# Sampled, non-blocking logging of scored traffic for drift analysis / retraining
+#
+# The request path only samples and does a put_nowait of the already-assembled
+# feature rows + probabilities onto a bounded queue. A background thread drains
+# it in batches and appends one NDJSON line per transaction:
+#
+#   {"ts": 1718000000.123, "model_version": "...", "fraud_probability": 0.03,
+#    "features": {"TransactionAmt": 59.0, ...}}
+#
+# "features" has the same shape as the /predict "data" payload, so logged
+# traffic can be replayed against the API or loaded with pd.read_json(lines=True).
+# Files rotate by size and age; each worker process writes its own files.
+# If the writer falls behind, new rows are dropped (and counted), never waited on.
+
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+import orjson
+
+
+class TrafficLogger:
+    def __init__(
+        self,
+        directory,
+        sample_rate=0.01,
+        max_queue=1024,
+        max_batch_rows=4096,
+        rotate_bytes=64 * 1024 * 1024,
+        rotate_seconds=3600,
+        keep_files=48,
+        metrics=None,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_batch_rows = max_batch_rows
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.keep_files = keep_files
+        # dict with optional keys: logged, dropped, backlog, write_errors
+        self.metrics = metrics or {}
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._file = None
+        self._file_opened_at = 0.0
+        self._file_seq = 0
+        self._files = []  # this process's files, oldest first
+
+    # -----------------------
+    # LIFECYCLE
+    # -----------------------
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-logger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._close()
+
+    # -----------------------
+    # REQUEST PATH
+    # -----------------------
+
+    def observe(self, matrix, probs, mv):
+        """Queue scored rows for logging. Never blocks."""
+        if self.sample_rate <= 0 or len(matrix) == 0:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        # Copy: callers may reuse their buffers
+        rows = np.array(matrix, dtype=np.float64, ndmin=2)
+        try:
+            self._queue.put_nowait((
+                time.time(),
+                mv.version,
+                mv.feature_columns,
+                rows,
+                np.array(probs, dtype=np.float64, ndmin=1)
+            ))
+        except queue.Full:
+            self._inc("dropped", len(rows))
+        self._update_backlog()
+
+    # -----------------------
+    # BACKGROUND WRITER
+    # -----------------------
+
+    def _inc(self, name, amount=1):
+        metric = self.metrics.get(name)
+        if metric is not None:
+            metric.inc(amount)
+
+    def _update_backlog(self):
+        metric = self.metrics.get("backlog")
+        if metric is not None:
+            metric.set(self._queue.qsize())
+
+    def _drain(self):
+        try:
+            items = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        n_rows = len(items[0][3])
+        while n_rows < self.max_batch_rows:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item[3])
+        return items
+
+    def _run(self):
+        while not self._stop.is_set():
+            items = self._drain()
+            self._update_backlog()
+            if not items:
+                # Idle: still close files that have aged out
+                if self._file is not None and time.time() - self._file_opened_at >= self.rotate_seconds:
+                    self._close()
+                continue
+
+            try:
+                n_rows = self._write(items)
+            except OSError as e:
+                print(f"Traffic log write failed: {e}")
+                self._inc("write_errors")
+                self._close()
+                continue
+            self._inc("logged", n_rows)
+
+    def _write(self, items):
+        lines = []
+        for ts, version, columns, matrix, probs in items:
+            for row, prob in zip(matrix.tolist(), probs.tolist()):
+                lines.append(orjson.dumps({
+                    "ts": ts,
+                    "model_version": version,
+                    "fraud_probability": prob,
+                    "features": dict(zip(columns, row))
+                }))
+        lines.append(b"")
+
+        f = self._current_file()
+        f.write(b"\n".join(lines))
+        f.flush()
+        if f.tell() >= self.rotate_bytes:
+            self._close()
+        return len(lines) - 1
+
+    # -----------------------
+    # ROTATION
+    # -----------------------
+
+    def _current_file(self):
+        if self._file is not None and time.time() - self._file_opened_at >= self.rotate_seconds:
+            self._close()
+        if self._file is None:
+            now = time.time()
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))
+            self._file_seq += 1
+            path = os.path.join(self.directory, f"traffic-{stamp}-{os.getpid()}-{self._file_seq}.ndjson")
+            self._file = open(path, "ab")
+            self._file_opened_at = now
+            self._files.append(path)
+            self._prune()
+        return self._file
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _prune(self):
+        while self.keep_files > 0 and len(self._files) > self.keep_files:
+            path = self._files.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pandas DataFrame row building vs the precompiled FeatureAssembler
+
+Measures the per-request cost of turning a request dict into a model-ready
+float64 row, and checks that both paths produce identical values.
+
+Usage:
+    python -m benchmarks.bench_assembler --features 400 --iterations 20000
+"""
+
+import argparse
+import random
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from api.features import FeatureAssembler
+
+
+def make_request(feature_columns, seed=0):
+    rng = random.Random(seed)
+    data = {}
+    for i, col in enumerate(feature_columns):
+        # Mix of ints and floats, like the JSON payloads we receive
+        data[col] = rng.randint(0, 500) if i % 3 == 0 else rng.random() * 100
+    return data
+
+
+def dataframe_path(data, feature_columns):
+    input_df = pd.DataFrame([data])
+    input_df = input_df[feature_columns]
+    # sklearn's check_array ends up with this float64 array
+    return input_df.to_numpy(dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature assembly benchmark")
+    parser.add_argument("--features", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    feature_columns = [f"f{i}" for i in range(args.features)]
+    data = make_request(feature_columns)
+    assembler = FeatureAssembler(feature_columns)
+
+    # Parity check first
+    expected = dataframe_path(data, feature_columns)
+    actual = assembler.assemble(data).reshape(1, -1)
+    assert np.array_equal(expected, actual), "Assembler output differs from DataFrame path"
+
+    df_time = timeit.timeit(lambda: dataframe_path(data, feature_columns), number=args.iterations)
+    asm_time = timeit.timeit(lambda: assembler.assemble(data), number=args.iterations)
+
+    df_us = df_time / args.iterations * 1e6
+    asm_us = asm_time / args.iterations * 1e6
+
+    print("=" * 60)
+    print(f"Features: {args.features} | Iterations: {args.iterations}")
+    print("=" * 60)
+    print(f"DataFrame path:  {df_us:10.2f} us/request")
+    print(f"Assembler path:  {asm_us:10.2f} us/request")
+    print(f"Speedup:         {df_us / asm_us:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP /predict vs the binary scoring protocol
+
+Runs against a live API started with the binary listener enabled, e.g.
+    BINARY_SOCKET_PATH=/tmp/fraud-api.sock uvicorn api.main:app --port 8000
+
+and scores the same random rows through:
+  - HTTP /predict with a positional JSON body on a keep-alive session
+  - the binary protocol, one request at a time
+  - the binary protocol, pipelined (several requests in flight)
+  - the binary protocol, batched (many rows per frame)
+
+Usage:
+    python -m benchmarks.bench_binary_protocol --socket /tmp/fraud-api.sock --requests 5000
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import requests
+
+from api.binary_client import BinaryScoringClient
+
+
+def timed(fn, n):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t)
+    return time.perf_counter() - start, latencies
+
+
+def report(label, n_rows, elapsed, latencies=None):
+    line = f"{label:>22}: {n_rows / elapsed:10.0f} rows/s"
+    if latencies:
+        q = statistics.quantiles(latencies, n=100)
+        line += f" | p50 {q[49] * 1e6:8.1f} us | p99 {q[98] * 1e6:8.1f} us"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary protocol vs HTTP benchmark")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--socket", default="/tmp/fraud-api.sock", help="Unix socket path ('' to use --port)")
+    parser.add_argument("--port", type=int, default=9000, help="Binary TCP port if --socket is empty")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=32, help="Pipelining depth")
+    parser.add_argument("--batch", type=int, default=256, help="Rows per batched frame")
+    args = parser.parse_args()
+
+    client = BinaryScoringClient(path=args.socket or None, port=args.port)
+    n_features = len(client.feature_columns)
+    rows = np.random.default_rng(0).normal(size=(args.requests, n_features))
+
+    # Parity check first: both transports must return the same probabilities
+    http = requests.Session()
+    http_prob = http.post(f"{args.url}/predict", json={"features": rows[0].tolist()}).json()["fraud_probability"]
+    binary_prob = float(client.score(rows[0])[0])
+    assert abs(http_prob - binary_prob) < 1e-9, f"HTTP {http_prob} != binary {binary_prob}"
+
+    print("=" * 60)
+    print(f"Features: {n_features} | Requests: {args.requests} | Model: {client.model_version}")
+    print("=" * 60)
+
+    elapsed, latencies = timed(
+        lambda i: http.post(f"{args.url}/predict", json={"features": rows[i].tolist()}).raise_for_status(),
+        args.requests
+    )
+    report("HTTP /predict", args.requests, elapsed, latencies)
+
+    elapsed, latencies = timed(lambda i: client.score(rows[i]), args.requests)
+    report("binary sequential", args.requests, elapsed, latencies)
+
+    start = time.perf_counter()
+    results = client.score_pipelined(rows, depth=args.depth)
+    report(f"binary pipelined x{args.depth}", args.requests, time.perf_counter() - start)
+    errors = sum(isinstance(r, Exception) for r in results)
+    if errors:
+        print(f"{'':>22}  ({errors} requests shed)")
+
+    start = time.perf_counter()
+    for i in range(0, args.requests, args.batch):
+        client.score(rows[i:i + args.batch])
+    report(f"binary batch x{args.batch}", args.requests, time.perf_counter() - start)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API cold start time and peak RSS, mlflow model vs serving artifact
+
+Each measurement runs in a fresh interpreter that imports api.main and runs
+the FastAPI lifespan startup, i.e. everything a new pod does before it can
+serve its first request.
+
+Usage:
+    python -m benchmarks.bench_cold_start --artifact serving_model --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import asyncio, json, resource, time
+start = time.perf_counter()
+import api.main as m
+imported = time.perf_counter()
+
+async def boot():
+    async with m.lifespan(m.app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({
+    "import_s": imported - start,
+    "ready_s": ready - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(env, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            env=env, capture_output=True, text=True, check=True
+        )
+        # Last line is our JSON; lifespan prints come before it
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold start benchmark")
+    parser.add_argument("--artifact", default="serving_model", help="Serving artifact directory")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base_env = {k: v for k, v in os.environ.items() if k != "SERVING_ARTIFACT"}
+    results = {"mlflow": measure(base_env, args.runs)}
+    if os.path.isdir(args.artifact):
+        results["artifact"] = measure({**base_env, "SERVING_ARTIFACT": args.artifact}, args.runs)
+    else:
+        print(f"Artifact dir '{args.artifact}' not found; run training first to compare")
+
+    print("=" * 60)
+    print(f"{'mode':>10} | {'import (s)':>10} | {'ready (s)':>10} | {'peak RSS (MB)':>14}")
+    print("-" * 60)
+    for mode, r in results.items():
+        print(f"{mode:>10} | {r['import_s']:10.3f} | {r['ready_s']:10.3f} | {r['max_rss_mb']:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /metrics render time with multiprocess aggregation
+
+Forks N worker processes that each write the API's metric families at a
+realistic label cardinality (endpoints x model versions x stages) into a
+PROMETHEUS_MULTIPROC_DIR, then times a full merge + render, uncached and
+through the MetricsExporter scrape cache, for a growing number of workers.
+
+Usage:
+    python -m benchmarks.bench_metrics_scrape --workers 1 2 4 8 --versions 2
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+ENDPOINTS = ("/predict", "/predict/batch", "/predict/stream")
+STAGES = ("parse", "validate", "assemble", "queue", "score", "serialize")
+ROUTES = ("/predict", "/predict/batch", "/predict/stream", "/health", "/ready", "/metrics")
+
+
+def write_worker_metrics(versions, observations):
+    # Same families, label sets and gauge modes as api/main.py
+    from prometheus_client import Counter, Gauge, Histogram
+
+    from api.timing import STAGE_BUCKETS
+
+    predictions = Counter("predictions_total", "", ["endpoint", "model_version"])
+    latency = Histogram("prediction_latency_seconds", "", ["endpoint", "model_version"], buckets=STAGE_BUCKETS)
+    stages = Histogram("prediction_stage_seconds", "", ["endpoint", "stage"], buckets=STAGE_BUCKETS)
+    server = Histogram("http_server_seconds", "", ["method", "route", "status"], buckets=STAGE_BUCKETS)
+    in_progress = Gauge("predictions_in_progress", "", multiprocess_mode="livesum")
+    active = Gauge("model_active", "", ["model_version"], multiprocess_mode="livemax")
+
+    for i in range(observations):
+        value = (i % 100) / 1e5
+        for endpoint in ENDPOINTS:
+            for v in range(versions):
+                predictions.labels(endpoint, f"v{v}").inc()
+                latency.labels(endpoint, f"v{v}").observe(value)
+            for stage in STAGES:
+                stages.labels(endpoint, stage).observe(value)
+        for route in ROUTES:
+            server.labels("POST", route, "200").observe(value)
+    in_progress.set(0)
+    for v in range(versions):
+        active.labels(f"v{v}").set(v == 0)
+
+
+def populate(n_workers, versions, observations):
+    for _ in range(n_workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                write_worker_metrics(versions, observations)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiprocess metrics scrape benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--versions", type=int, default=2, help="Model versions per labeled family")
+    parser.add_argument("--observations", type=int, default=200, help="Observations per series per worker")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    metrics_dir = tempfile.mkdtemp(prefix="metrics-bench-")
+    # Must be set before prometheus_client is first imported
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    from api.metrics_export import MetricsExporter
+
+    uncached = MetricsExporter(cache_seconds=0)
+    cached = MetricsExporter(cache_seconds=1.0)
+
+    print("=" * 60)
+    print(f"{'workers':>8} | {'files':>6} | {'body (KB)':>10} | {'uncached (ms)':>14} | {'cached (us)':>12}")
+    print("-" * 60)
+    try:
+        total = 0
+        for n_workers in sorted(args.workers):
+            populate(n_workers - total, args.versions, args.observations)
+            total = n_workers
+
+            body = uncached.render()
+            cold = timeit.timeit(uncached.render, number=args.iterations) / args.iterations * 1e3
+            cached.render()
+            warm = timeit.timeit(cached.render, number=args.iterations * 100) / (args.iterations * 100) * 1e6
+            n_files = len(os.listdir(metrics_dir))
+            print(f"{n_workers:>8} | {n_files:>6} | {len(body) / 1024:10.1f} | {cold:14.2f} | {warm:12.2f}")
+    finally:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
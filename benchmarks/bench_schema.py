@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: free-form `data: dict` validation vs the compiled FeatureSchema
+
+Old path: pydantic validates `data` as a plain dict, then the FeatureAssembler
+turns it into a float64 row (bad input is only caught there). New path: one
+pydantic-core pass over a model compiled from the feature names coerces and
+checks every value and yields the row. Also times how fast each rejects a
+payload with a non-numeric value.
+
+Usage:
+    python -m benchmarks.bench_schema --features 400 --iterations 20000
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from api.features import FeatureAssembler, FeatureError
+from api.schema import FeatureSchema
+from benchmarks.bench_assembler import make_request
+
+
+class DictRequest(BaseModel):
+    data: dict
+
+
+def dict_path(payload, assembler):
+    return assembler.assemble(DictRequest.model_validate(payload).data)
+
+
+def rejects(fn, *errors):
+    def run():
+        try:
+            fn()
+        except errors:
+            return
+        raise AssertionError("bad payload was accepted")
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request schema validation benchmark")
+    parser.add_argument("--features", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    feature_columns = [f"f{i}" for i in range(args.features)]
+    payload = {"data": make_request(feature_columns)}
+    bad = {"data": {**payload["data"], feature_columns[-1]: "n/a"}}
+
+    assembler = FeatureAssembler(feature_columns)
+    schema = FeatureSchema(feature_columns)
+
+    # Parity check first
+    expected = dict_path(payload, assembler)
+    actual = schema.validate_row(payload)
+    assert np.array_equal(expected, actual), "Schema output differs from dict path"
+
+    n = args.iterations
+    timings = {
+        "valid": (
+            timeit.timeit(lambda: dict_path(payload, assembler), number=n),
+            timeit.timeit(lambda: schema.validate_row(payload), number=n),
+        ),
+        "invalid": (
+            timeit.timeit(rejects(lambda: dict_path(bad, assembler), FeatureError), number=n),
+            timeit.timeit(rejects(lambda: schema.validate_row(bad), ValidationError), number=n),
+        ),
+    }
+
+    print("=" * 60)
+    print(f"Features: {args.features} | Iterations: {n}")
+    print("=" * 60)
+    for label, (old, new) in timings.items():
+        old_us = old / n * 1e6
+        new_us = new / n * 1e6
+        print(f"{label:>8}: dict {old_us:9.2f} us | schema {new_us:9.2f} us | "
+              f"{n / new:10.0f} req/s | {old_us / new_us:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sklearn predict_proba vs the native linear scoring kernel
+
+Fits a LogisticRegression on synthetic data, checks that LinearScorer matches
+predict_proba, then times single-row and batch scoring through both.
+
+Usage:
+    python -m benchmarks.bench_scoring --features 400 --iterations 20000
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from api.scoring import SklearnScorer, build_scorer, check_parity
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring backend benchmark")
+    parser.add_argument("--features", type=int, default=400)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(5000, args.features))
+    y = (X[:, 0] + rng.normal(size=5000) > 1.5).astype(int)
+    model = LogisticRegression(max_iter=1000, class_weight="balanced").fit(X, y)
+
+    native = build_scorer(model, args.features)
+    fallback = SklearnScorer(model)
+    print(f"Selected backend: {native.name}")
+    print(f"Max |diff| vs predict_proba: {check_parity(native, model, args.features):.2e}")
+
+    row = rng.normal(size=(1, args.features))
+    batch = rng.normal(size=(args.batch, args.features))
+
+    print("=" * 60)
+    for label, matrix, number in (
+        ("1 row", row, args.iterations),
+        (f"{args.batch} rows", batch, max(args.iterations // 100, 10)),
+    ):
+        sk = timeit.timeit(lambda: fallback.predict(matrix), number=number) / number * 1e6
+        nat = timeit.timeit(lambda: native.predict(matrix), number=number) / number * 1e6
+        print(f"{label:>12}: sklearn {sk:10.2f} us | native {nat:10.2f} us | {sk / nat:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.admission import AdmissionController, Overloaded
+
+
+def controller(max_workers=2, slo_ms=100):
+    return AdmissionController(max_workers=max_workers, max_queue=8, deadline_ms=5000, slo_ms=slo_ms)
+
+
+def test_recovers_after_slow_outlier():
+    admission = controller()
+
+    async def scenario():
+        # One slow job pushes the estimate far past the SLO...
+        await admission.run(time.sleep, 0.3, kind="row")
+        assert admission.service_time("row") > admission.slo
+
+        # ...but idle workers keep admitting, so fast jobs bring it back down
+        for _ in range(50):
+            await admission.run(lambda: None, kind="row")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        admission.shutdown()
+    assert admission.service_time("row") < admission.slo
+    assert admission.pending == 0
+
+
+def test_estimates_are_per_kind():
+    admission = controller()
+    try:
+        asyncio.run(admission.run(time.sleep, 0.3, kind="batch"))
+        asyncio.run(admission.run(lambda: None, kind="row"))
+    finally:
+        admission.shutdown()
+    assert admission.service_time("batch") > admission.slo
+    assert admission.service_time("row") < admission.slo
+
+
+def test_sheds_when_busy_and_slo_would_be_missed():
+    admission = controller(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        await admission.run(time.sleep, 0.3, kind="batch")
+        blocker = asyncio.create_task(admission.run(release.wait, kind="batch"))
+        while admission.pending < 1:
+            await asyncio.sleep(0.01)
+
+        with pytest.raises(Overloaded) as shed:
+            await admission.run(lambda: None, kind="batch")
+        assert shed.value.status_code == 503
+        assert shed.value.reason == "slo"
+
+        release.set()
+        await blocker
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        admission.shutdown()
+
+
+def test_deadline_can_be_waived():
+    admission = AdmissionController(max_workers=1, max_queue=8, deadline_ms=50, slo_ms=1000)
+
+    async def scenario():
+        with pytest.raises(Overloaded) as shed:
+            await admission.run(time.sleep, 0.2, kind="warm_up")
+        assert shed.value.reason == "deadline"
+
+        # Warm-up waits for its job however long the first call takes
+        await admission.run(time.sleep, 0.2, kind="warm_up", enforce_deadline=False)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        admission.shutdown()
+    assert admission.pending == 0
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+orjson = pytest.importorskip("orjson")
+
+from api.admission import Overloaded
+from api.binary_client import BinaryScoringClient, ScoringError
+from api.binary_protocol import (
+    LENGTH, OP_INFO, REQUEST_HEADER, STATUS_BAD_REQUEST, STATUS_OK,
+    BinaryScoringServer, decode_response, encode_request, encode_response
+)
+from api.features import FeatureError
+
+
+def test_request_frame_layout():
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    frame = encode_request(7, matrix)
+
+    length, request_id, op, dtype, _, n_rows, n_features = REQUEST_HEADER.unpack_from(frame)
+    assert length == len(frame) - LENGTH.size
+    assert (request_id, dtype, n_rows, n_features) == (7, 1, 2, 3)
+    np.testing.assert_array_equal(np.frombuffer(frame[REQUEST_HEADER.size:], "<f4"), matrix.ravel())
+
+    # Anything that isn't float32/float64 goes as float64; a 1-D row is one row
+    _, _, _, dtype, _, n_rows, n_features = REQUEST_HEADER.unpack_from(encode_request(8, [1, 2, 3]))
+    assert (dtype, n_rows, n_features) == (2, 1, 3)
+
+
+def test_response_round_trip():
+    probs = np.array([0.1, 0.9])
+    frame = encode_response(3, STATUS_OK, probs.tobytes(), "v1", 2)
+    request_id, status, version, payload = decode_response(frame)
+    assert (request_id, status, version) == (3, STATUS_OK, "v1")
+    assert payload.dtype == np.float64
+    np.testing.assert_array_equal(payload, probs)
+
+
+def test_zero_row_response_is_an_empty_array():
+    _, status, _, payload = decode_response(encode_response(4, STATUS_OK, b"", "v1", 0))
+    assert status == STATUS_OK
+    assert isinstance(payload, np.ndarray) and payload.dtype == np.float64 and payload.shape == (0,)
+
+
+def test_error_and_info_payloads_are_bytes():
+    _, status, _, payload = decode_response(encode_response(5, STATUS_BAD_REQUEST, b"bad"))
+    assert (status, payload) == (STATUS_BAD_REQUEST, b"bad")
+
+    info = orjson.dumps({"model_version": "v1"})
+    _, status, _, payload = decode_response(encode_response(6, STATUS_OK, info), op=OP_INFO)
+    assert orjson.loads(payload) == {"model_version": "v1"}
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    async def score(matrix):
+        if matrix.shape[1] != 2:
+            raise FeatureError("Expected 2 features")
+        if len(matrix) and matrix[0, 0] < 0:
+            raise Overloaded(503, "slo", 1)
+        # Later rows first: pipelined responses come back out of order
+        await asyncio.sleep(0.02 * (matrix[0, 0] if len(matrix) else 0))
+        return matrix.sum(axis=1), "v1"
+
+    def info():
+        return {"model_version": "v1", "feature_columns": ["a", "b"]}
+
+    path = str(tmp_path / "score.sock")
+    loop = asyncio.new_event_loop()
+    server = BinaryScoringServer(score, info)
+    loop.run_until_complete(server.start_unix(path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield path
+
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def test_client_against_server(socket_path):
+    with BinaryScoringClient(path=socket_path) as client:
+        assert client.feature_columns == ["a", "b"]
+        np.testing.assert_array_equal(client.score([[1.0, 2.0], [3.0, 4.0]]), [3.0, 7.0])
+        assert client.score(np.empty((0, 2))).shape == (0,)
+
+        with pytest.raises(ScoringError) as bad:
+            client.score([[1.0, 2.0, 3.0]])
+        assert bad.value.status == STATUS_BAD_REQUEST
+
+        with pytest.raises(ScoringError) as shed:
+            client.score([[-1.0, 0.0]])
+        assert shed.value.overloaded
+
+        # Matched back to input order by request_id
+        results = client.score_pipelined([[[3.0, 0.0]], [[2.0, 0.0]], [[1.0, 0.0]]], depth=3)
+        assert [float(r[0]) for r in results] == [3.0, 2.0, 1.0]
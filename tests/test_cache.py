@@ -0,0 +1,95 @@
+import pytest
+
+from api import cache as cache_module
+from api.cache import PredictionCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Counter:
+    # Stands in for a labelled prometheus Counter: counter.labels(reason).inc(n)
+    def __init__(self):
+        self.counts = {}
+        self._reason = None
+
+    def labels(self, reason):
+        self._reason = reason
+        return self
+
+    def inc(self, n=1):
+        self.counts[self._reason] = self.counts.get(self._reason, 0) + n
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_hit_and_miss(clock):
+    cache = PredictionCache(max_size=4, ttl_seconds=60)
+    assert cache.get(b"a", "v1") is None
+    cache.put(b"a", "v1", 0.25)
+    assert cache.get(b"a", "v1") == 0.25
+    assert cache.get(b"b", "v1") is None
+
+
+def test_scoped_to_model_version(clock):
+    evictions = Counter()
+    cache = PredictionCache(max_size=4, ttl_seconds=60, eviction_metric=evictions)
+    cache.get(b"a", "v1")
+    cache.put(b"a", "v1", 0.25)
+    cache.put(b"b", "v1", 0.5)
+
+    # First lookup under the new version drops everything the old one cached
+    assert cache.get(b"a", "v2") is None
+    assert evictions.counts == {"model_change": 2}
+
+    # A late write from the retired version is ignored
+    cache.put(b"a", "v1", 0.25)
+    assert cache.get(b"a", "v2") is None
+    cache.put(b"a", "v2", 0.75)
+    assert cache.get(b"a", "v2") == 0.75
+
+
+def test_entries_expire_after_ttl(clock):
+    evictions = Counter()
+    cache = PredictionCache(max_size=4, ttl_seconds=60, eviction_metric=evictions)
+    cache.get(b"a", "v1")
+    cache.put(b"a", "v1", 0.25)
+
+    clock.now += 59
+    assert cache.get(b"a", "v1") == 0.25
+    # A hit doesn't extend the TTL
+    clock.now += 2
+    assert cache.get(b"a", "v1") is None
+    assert evictions.counts == {"ttl": 1}
+
+
+def test_lru_eviction(clock):
+    evictions = Counter()
+    cache = PredictionCache(max_size=2, ttl_seconds=60, eviction_metric=evictions)
+    cache.get(b"a", "v1")
+    cache.put(b"a", "v1", 0.1)
+    cache.put(b"b", "v1", 0.2)
+    cache.get(b"a", "v1")  # a is now the most recently used
+    cache.put(b"c", "v1", 0.3)
+
+    assert cache.get(b"b", "v1") is None
+    assert cache.get(b"a", "v1") == 0.1
+    assert cache.get(b"c", "v1") == 0.3
+    assert evictions.counts == {"lru": 1}
+
+
+def test_key_is_the_assembled_vector():
+    np = pytest.importorskip("numpy")
+    row = np.array([1.0, 2.0, 3.0])
+    assert PredictionCache.key(row) == PredictionCache.key(np.array([1, 2, 3], dtype=np.float64))
+    assert PredictionCache.key(row) != PredictionCache.key(np.array([1.0, 2.0, 3.5]))
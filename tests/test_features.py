@@ -0,0 +1,83 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from api.features import (
+    ExtraFeatureError, FeatureAssembler, InvalidFeatureError, MissingFeatureError
+)
+
+FEATURES = ["TransactionAmt", "card1", "C1", "D1"]
+
+
+def dataframe_path(records, feature_columns):
+    # What the API did before the assembler existed
+    return pd.DataFrame(records)[feature_columns].astype(np.float64).to_numpy()
+
+
+def test_matches_dataframe_path():
+    records = [
+        {"TransactionAmt": 68.5, "card1": 13926, "C1": 1.0, "D1": 14.0},
+        # Key order, ints, numeric strings and unknown keys must not matter
+        {"D1": 0, "C1": 2, "card1": 2755, "TransactionAmt": "29.0", "extra": "ignored"},
+        {"TransactionAmt": 1e-7, "card1": -1, "C1": float("inf"), "D1": np.float32(0.1)},
+    ]
+    matrix, errors = FeatureAssembler(FEATURES).assemble_many(records)
+
+    assert errors == {}
+    assert matrix.dtype == np.float64 and matrix.flags.c_contiguous
+    np.testing.assert_array_equal(matrix, dataframe_path(records, FEATURES))
+
+
+def test_single_feature_model():
+    records = [{"TransactionAmt": 3.5}, {"TransactionAmt": 4}]
+    matrix, errors = FeatureAssembler(["TransactionAmt"]).assemble_many(records)
+    assert errors == {}
+    np.testing.assert_array_equal(matrix, dataframe_path(records, ["TransactionAmt"]))
+
+
+def test_bad_rows_are_reported_not_raised():
+    records = [
+        {"TransactionAmt": 1, "card1": 2, "C1": 3, "D1": 4},
+        {"TransactionAmt": 1, "card1": 2, "C1": 3},
+        {"TransactionAmt": "abc", "card1": 2, "C1": None, "D1": 4},
+    ]
+    matrix, errors = FeatureAssembler(FEATURES).assemble_many(records)
+
+    assert sorted(errors) == [1, 2]
+    assert "D1" in errors[1]
+    assert "TransactionAmt" in errors[2] and "C1" in errors[2]
+    np.testing.assert_array_equal(matrix[0], [1, 2, 3, 4])
+    np.testing.assert_array_equal(matrix[1:], 0.0)
+
+
+def test_errors_carry_the_offending_features():
+    assembler = FeatureAssembler(FEATURES, strict=True)
+    with pytest.raises(MissingFeatureError) as missing:
+        assembler.assemble({"TransactionAmt": 1, "card1": 2})
+    assert missing.value.missing == ["C1", "D1"]
+
+    with pytest.raises(InvalidFeatureError) as invalid:
+        assembler.assemble({"TransactionAmt": [1], "card1": 2, "C1": 3, "D1": 4})
+    assert invalid.value.invalid == ["TransactionAmt"]
+
+    with pytest.raises(ExtraFeatureError) as extra:
+        assembler.assemble({"TransactionAmt": 1, "card1": 2, "C1": 3, "D1": 4, "card99": 5})
+    assert extra.value.extra == ["card99"]
+
+
+def test_optional_features_default_to_zero():
+    records = [
+        {"TransactionAmt": 10.0, "card1": 1},
+        {"TransactionAmt": 20.0, "card1": 2, "D1": 7.0},
+    ]
+    matrix, errors = FeatureAssembler(FEATURES, optional_features=["C1", "D1"]).assemble_many(records)
+
+    assert errors == {}
+    expected = pd.DataFrame(records).reindex(columns=FEATURES).fillna(0).to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(matrix, expected)
+
+    # "*" makes every feature optional
+    matrix, errors = FeatureAssembler(FEATURES, optional_features="*").assemble_many([{}])
+    assert errors == {}
+    np.testing.assert_array_equal(matrix, [[0.0, 0.0, 0.0, 0.0]])
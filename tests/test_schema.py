@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pydantic = pytest.importorskip("pydantic")
+
+from api.features import FeatureAssembler, MissingFeatureError
+from api.schema import FeatureSchema
+
+# "copy" and "model_config" would clash with BaseModel attributes as field names
+FEATURES = ["TransactionAmt", "copy", "model_config", "D1"]
+
+
+def test_json_schema_uses_feature_names_in_order():
+    schema = FeatureSchema(FEATURES, optional_features=["D1"]).json_schema()
+    features = schema["$defs"]["Features"]
+
+    assert list(features["properties"]) == FEATURES
+    assert features["required"] == ["TransactionAmt", "copy", "model_config"]
+    assert features["properties"]["D1"]["default"] == 0.0
+
+
+def test_row_matches_assembler():
+    record = {"D1": 3, "model_config": "2.5", "copy": 1, "TransactionAmt": 68.5, "extra": 1}
+    row = FeatureSchema(FEATURES).validate_row({"data": record})
+
+    assert row.dtype == np.float64
+    np.testing.assert_array_equal(row, [68.5, 1.0, 2.5, 3.0])
+    np.testing.assert_array_equal(row, FeatureAssembler(FEATURES).assemble(record))
+
+
+@pytest.mark.parametrize("optional", [["copy", "D1"], "*"])
+def test_optional_defaults_match_assembler(optional):
+    record = {"TransactionAmt": 1.0, "model_config": 2.0}
+    schema = FeatureSchema(FEATURES, optional_features=optional)
+    assembler = FeatureAssembler(FEATURES, optional_features=optional)
+
+    row = schema.validate_row({"data": record})
+    np.testing.assert_array_equal(row, [1.0, 0.0, 2.0, 0.0])
+    np.testing.assert_array_equal(row, assembler.assemble(record))
+
+
+def test_required_features_agree_with_assembler():
+    record = {"TransactionAmt": 1.0}
+    with pytest.raises(pydantic.ValidationError) as invalid:
+        FeatureSchema(FEATURES, optional_features=["D1"]).validate_row({"data": record})
+    missing = sorted(error["loc"][-1] for error in invalid.value.errors() if error["type"] == "missing")
+
+    with pytest.raises(MissingFeatureError) as assembler_missing:
+        FeatureAssembler(FEATURES, optional_features=["D1"]).assemble(record)
+    assert missing == sorted(assembler_missing.value.missing) == ["copy", "model_config"]
+
+
+def test_rejects_non_finite_and_strict_extras():
+    record = dict.fromkeys(FEATURES, 1.0)
+    with pytest.raises(pydantic.ValidationError):
+        FeatureSchema(FEATURES).validate_row({"data": {**record, "D1": float("nan")}})
+
+    FeatureSchema(FEATURES).validate_row({"data": {**record, "extra": 1}})
+    with pytest.raises(pydantic.ValidationError):
+        FeatureSchema(FEATURES, strict=True).validate_row({"data": {**record, "extra": 1}})
@@ -0,0 +1,87 @@
+import os
+
+from training.stage_cache import StageCache
+
+
+def copy_stage(out_path, src, suffix=""):
+    with open(src) as f, open(out_path, "w") as out:
+        out.write(f.read() + suffix)
+
+
+def copy_stage_v2(out_path, src, suffix=""):
+    with open(src) as f, open(out_path, "w") as out:
+        out.write(f.read().upper() + suffix)
+
+
+def raw_input(tmp_path, text="a,b\n1,2\n"):
+    path = tmp_path / "raw.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_second_run_is_a_hit(tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    src = raw_input(tmp_path)
+
+    first = cache.run("copy", copy_stage, {"src": src}, ext=".txt")
+    # Rewritten with the same content: new mtime, same fingerprint
+    src = raw_input(tmp_path)
+    second = cache.run("copy", copy_stage, {"src": src}, ext=".txt")
+
+    assert first == second
+    assert [e["hit"] for e in cache.events] == [False, True]
+
+
+def test_key_changes_with_params_input_and_code(tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    src = raw_input(tmp_path)
+    base = cache.key("copy", copy_stage, {"src": src}, {"suffix": ""})
+
+    assert cache.key("copy", copy_stage, {"src": src}, {"suffix": ""}) == base
+    assert cache.key("copy", copy_stage, {"src": src}, {"suffix": "!"}) != base
+    assert cache.key("copy", copy_stage_v2, {"src": src}, {"suffix": ""}) != base
+
+    raw_input(tmp_path, "a,b\n1,3\n")
+    assert cache.key("copy", copy_stage, {"src": src}, {"suffix": ""}) != base
+
+
+def test_downstream_key_follows_upstream_output(tmp_path):
+    cache = StageCache(tmp_path / "cache")
+    src = raw_input(tmp_path)
+
+    upstream = cache.run("copy", copy_stage, {"src": src}, ext=".txt")
+    downstream = cache.run("suffix", copy_stage, {"src": upstream}, {"suffix": "!"}, ext=".txt")
+    with open(downstream) as f:
+        assert f.read() == "a,b\n1,2\n!"
+
+    # Changing an upstream parameter invalidates everything after it
+    upstream2 = cache.run("copy", copy_stage, {"src": src}, {"suffix": "?"}, ext=".txt")
+    downstream2 = cache.run("suffix", copy_stage, {"src": upstream2}, {"suffix": "!"}, ext=".txt")
+    assert downstream2 != downstream
+    assert [e["hit"] for e in cache.events] == [False, False, False, False]
+
+
+def test_disabled_cache_recomputes(tmp_path):
+    src = raw_input(tmp_path)
+    StageCache(tmp_path / "cache").run("copy", copy_stage, {"src": src}, ext=".txt")
+
+    cache = StageCache(tmp_path / "cache", enabled=False)
+    cache.run("copy", copy_stage, {"src": src}, ext=".txt")
+    assert cache.events[0]["hit"] is False
+
+
+def test_evicts_least_recently_used_but_not_current_run(tmp_path):
+    src = raw_input(tmp_path, "x" * 1000)
+    old = StageCache(tmp_path / "cache")
+    stale = old.run("copy", copy_stage, {"src": src}, {"suffix": "1"}, ext=".txt")
+    os.utime(stale, (0, 0))
+
+    # Room for two outputs: the stale one goes, both of this run's stay
+    cache = StageCache(tmp_path / "cache", max_bytes=2500)
+    kept = [
+        cache.run("copy", copy_stage, {"src": src}, {"suffix": "2"}, ext=".txt"),
+        cache.run("copy", copy_stage, {"src": src}, {"suffix": "3"}, ext=".txt"),
+    ]
+
+    assert not os.path.exists(stale)
+    assert all(os.path.exists(path) for path in kept)
@@ -0,0 +1,126 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+pytest.importorskip("prometheus_client")
+uvicorn = pytest.importorskip("uvicorn")
+
+FEATURES = ["f0", "f1", "f2"]
+
+
+def write_artifact(path):
+    np.save(path / "coef.npy", np.array([0.5, -0.25, 0.1]))
+    np.save(path / "intercept.npy", np.array([-1.0]))
+    meta = {
+        "format_version": 1,
+        "model_type": "LogisticRegression",
+        "model_version": "e2e",
+        "feature_columns": FEATURES,
+        "classes": [0, 1]
+    }
+    (path / "meta.json").write_text(json.dumps(meta))
+
+
+@pytest.fixture(scope="module")
+def port(tmp_path_factory):
+    artifact = tmp_path_factory.mktemp("serving_model")
+    write_artifact(artifact)
+    # api.main reads its config at import time
+    os.environ["SERVING_ARTIFACT"] = str(artifact)
+    os.environ["STREAM_CHUNK_SIZE"] = "500"
+    from api import main
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(main.app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+
+    port = sock.getsockname()[1]
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                break
+        except OSError:
+            pass
+        assert time.monotonic() < deadline, "server never became ready"
+        time.sleep(0.1)
+
+    yield port
+
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+def post_stream(port, content_type, lines, chunk_lines=1000):
+    # Raw chunked upload from a thread while the response is read here, like a
+    # real backfill client: the server answers before the body is finished
+    sock = socket.create_connection(("127.0.0.1", port), timeout=60)
+    head = (
+        "POST /predict/stream HTTP/1.1\r\n"
+        "Host: test\r\n"
+        f"Content-Type: {content_type}\r\n"
+        "Transfer-Encoding: chunked\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode()
+
+    def send():
+        sock.sendall(head)
+        for i in range(0, len(lines), chunk_lines):
+            data = b"".join(line + b"\n" for line in lines[i:i + chunk_lines])
+            sock.sendall(b"%x\r\n%s\r\n" % (len(data), data))
+        sock.sendall(b"0\r\n\r\n")
+
+    sender = threading.Thread(target=send, daemon=True)
+    sender.start()
+    try:
+        response = http.client.HTTPResponse(sock)
+        response.begin()
+        body = response.read()
+    finally:
+        sender.join(timeout=10)
+        sock.close()
+
+    return response.status, [json.loads(line) for line in body.splitlines() if line]
+
+
+def ndjson_lines(n):
+    return [json.dumps({"f0": i % 7, "f1": 0.5, "f2": -1.0}).encode() for i in range(n)]
+
+
+def assert_all_scored(results, n):
+    assert len(results) == n
+    assert [r["line"] for r in results] == list(range(1, n + 1))
+    assert all(0.0 <= r["fraud_probability"] <= 1.0 for r in results)
+
+
+def test_small_ndjson_body(port):
+    status, results = post_stream(port, "application/x-ndjson", ndjson_lines(3))
+    assert status == 200
+    assert_all_scored(results, 3)
+
+
+def test_large_ndjson_body(port):
+    status, results = post_stream(port, "application/x-ndjson", ndjson_lines(20_000))
+    assert status == 200
+    assert_all_scored(results, 20_000)
+
+
+def test_csv_body(port):
+    rows = [",".join(FEATURES).encode()] + [f"{i % 7},0.5,-1".encode() for i in range(5_000)]
+    status, results = post_stream(port, "text/csv", rows)
+    assert status == 200
+    assert len(results) == 5_000
+    # Line numbers count the header row
+    assert [r["line"] for r in results] == list(range(2, 5_002))
+    assert all(0.0 <= r["fraud_probability"] <= 1.0 for r in results)
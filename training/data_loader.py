@@ -0,0 +1,228 @@
+# Memory-lean loader for the processed training Parquet
+#
+# pd.read_parquet(...) loads every column as int64/float64, and the
+# drop(columns=[label]) / train_test_split that follow copy it again. This
+# module reads only the requested columns, row group by row group, straight
+# into one preallocated C-contiguous float32 matrix, plus a label vector in
+# the smallest integer type. No intermediate DataFrame is built.
+#
+# Every load returns the schema it applied (source type -> target type per
+# column, and whether float32 holds the column exactly) and a memory report.
+#
+#   python -m training.data_loader --data spark/processed_train.parquet --check-auc
+#
+# prints the memory saved and, with --check-auc, fits training_v1's model on
+# the full-width and the lean matrix with the same split and compares the AUCs.
+
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+LABEL = "isFraud"
+
+# Integers up to 2**24 are exactly representable in float32
+FLOAT32_EXACT_INT = 2 ** 24
+
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+# -----------------------
+# SCHEMA
+# -----------------------
+
+def _column_range(pf, name):
+    """(min, max) of a column from row-group statistics, or None if any group lacks them."""
+    index = pf.schema_arrow.get_field_index(name)
+    lo, hi = None, None
+    for i in range(pf.num_row_groups):
+        stats = pf.metadata.row_group(i).column(index).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        lo = stats.min if lo is None else min(lo, stats.min)
+        hi = stats.max if hi is None else max(hi, stats.max)
+    return lo, hi
+
+
+def smallest_int_type(lo, hi):
+    for dtype in INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def column_schema(pf, columns):
+    """
+    Per column: {"source", "target", "exact"}. Matrix columns become float32;
+    "exact" is False when float32 rounds values (floats, or ints beyond 2**24).
+    Integer columns also record the smallest safe integer type.
+    """
+    schema = {}
+    for name in columns:
+        source = pf.schema_arrow.field(name).type
+        entry = {"source": str(source), "target": "float32", "exact": False}
+        if pa.types.is_integer(source):
+            bounds = _column_range(pf, name)
+            if bounds is not None:
+                entry["int_type"] = str(smallest_int_type(*bounds))
+                entry["exact"] = max(abs(bounds[0]), abs(bounds[1])) <= FLOAT32_EXACT_INT
+        elif pa.types.is_floating(source):
+            entry["exact"] = source.bit_width <= 32
+        elif pa.types.is_boolean(source):
+            entry["exact"] = True
+        schema[name] = entry
+    return schema
+
+
+# -----------------------
+# LOADING
+# -----------------------
+
+def feature_columns_of(pf, label=LABEL, exclude=()):
+    """Every column except the label, in file order (what training_v1.py trains on)."""
+    return [name for name in pf.schema_arrow.names if name != label and name not in exclude]
+
+
+def iter_row_groups(pf, feature_columns, label=LABEL, extra_columns=(), order=None):
+    """Yield (X float32, y, {extra column: array}) one row group at a time."""
+    columns = list(feature_columns) + [label] + [c for c in extra_columns if c not in feature_columns]
+    for i in (order if order is not None else range(pf.num_row_groups)):
+        table = pf.read_row_group(i, columns=columns)
+        X = np.empty((table.num_rows, len(feature_columns)), dtype=np.float32)
+        _fill(X, table, feature_columns)
+        y = table.column(label).to_numpy(zero_copy_only=False).astype(np.int8)
+        extras = {c: table.column(c).to_numpy(zero_copy_only=False) for c in extra_columns}
+        del table
+        yield X, y, extras
+
+
+def _fill(out, table, feature_columns):
+    for j, col in enumerate(feature_columns):
+        # One column at a time: Arrow buffer -> strided write into the matrix
+        out[:, j] = table.column(col).to_numpy(zero_copy_only=False)
+
+
+def load_matrix(path, feature_columns=None, label=LABEL, exclude=()):
+    """
+    Read `feature_columns` (default: all but the label) into a C-contiguous
+    float32 matrix and the label into an int8 vector.
+    Returns (X, y, feature_columns, schema, report).
+    """
+    pf = pq.ParquetFile(path)
+    if feature_columns is None:
+        feature_columns = feature_columns_of(pf, label, exclude)
+    feature_columns = list(feature_columns)
+
+    n_rows = pf.metadata.num_rows
+    X = np.empty((n_rows, len(feature_columns)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=np.int8)
+
+    offset = 0
+    for i in range(pf.num_row_groups):
+        table = pf.read_row_group(i, columns=feature_columns + [label])
+        n = table.num_rows
+        _fill(X[offset:offset + n], table, feature_columns)
+        y[offset:offset + n] = table.column(label).to_numpy(zero_copy_only=False)
+        offset += n
+        del table
+
+    schema = column_schema(pf, feature_columns)
+    report = memory_report(pf, feature_columns, label, X, y)
+    return X, y, feature_columns, schema, report
+
+
+def load_columns(path, columns):
+    """
+    Read `columns` as separate arrays, each at its smallest safe type: ints at
+    the narrowest integer type their min/max fit, floats as float32.
+    Returns ({column: array}, schema).
+    """
+    pf = pq.ParquetFile(path)
+    schema = column_schema(pf, columns)
+    table = pf.read(columns=list(columns))
+    arrays = {}
+    for name in columns:
+        entry = schema[name]
+        target = entry.get("int_type", "float32")
+        entry["target"] = target
+        arrays[name] = table.column(name).to_numpy(zero_copy_only=False).astype(target, copy=False)
+        # Drop the Arrow column as soon as its narrow copy exists
+        table = table.drop([name])
+    return arrays, schema
+
+
+def memory_report(pf, feature_columns, label, X, y):
+    """Bytes at the file's full width (what pd.read_parquet holds) vs the lean arrays."""
+    arrow = pf.schema_arrow
+    full = 0
+    for name in list(feature_columns) + [label]:
+        field_type = arrow.field(name).type
+        width = field_type.bit_width // 8 if pa.types.is_primitive(field_type) else 8
+        full += width * pf.metadata.num_rows
+    lean = X.nbytes + y.nbytes
+    return {
+        "rows": int(pf.metadata.num_rows),
+        "columns": len(feature_columns),
+        "full_width_mb": full / 1024 ** 2,
+        "lean_mb": lean / 1024 ** 2,
+        "saved_mb": (full - lean) / 1024 ** 2,
+    }
+
+
+# -----------------------
+# CLI: memory + AUC check
+# -----------------------
+
+def fit_auc(features, labels, seed=42):
+    """Test AUC of training_v1's model on one 80/20 stratified split of (features, labels)."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        features, labels, test_size=0.2, random_state=seed, stratify=labels
+    )
+    model = LogisticRegression(max_iter=1000, class_weight="balanced").fit(X_train, y_train)
+    return roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+
+
+def full_width_auc(path, feature_columns, seed=42):
+    """fit_auc on the file read the old way (pd.read_parquet, int64/float64 columns)."""
+    import pandas as pd
+
+    df = pd.read_parquet(path, columns=list(feature_columns) + [LABEL])
+    return fit_auc(df[list(feature_columns)], df[LABEL], seed)
+
+
+def check_auc(path, X, y, feature_columns, seed=42):
+    """Fit training_v1's model on the full-width frame and the lean matrix; same split."""
+    return {
+        "full_width": full_width_auc(path, feature_columns, seed),
+        "lean": fit_auc(X, y, seed),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory-lean training data loader")
+    parser.add_argument("--data", default="spark/processed_train.parquet")
+    parser.add_argument("--check-auc", action="store_true", help="Compare model AUC on full-width vs lean data")
+    args = parser.parse_args()
+
+    X, y, feature_columns, schema, report = load_matrix(args.data)
+    inexact = [name for name, entry in schema.items() if not entry["exact"]]
+
+    print("=" * 60)
+    print(f"Rows: {report['rows']:,} | Columns: {report['columns']}")
+    print(f"Full width: {report['full_width_mb']:10.1f} MB")
+    print(f"Lean:       {report['lean_mb']:10.1f} MB")
+    print(f"Saved:      {report['saved_mb']:10.1f} MB")
+    print(f"Columns rounded by float32: {len(inexact)}")
+
+    if args.check_auc:
+        aucs = check_auc(args.data, X, y, feature_columns)
+        print("=" * 60)
+        for name, auc in aucs.items():
+            print(f"{name:>10} AUC: {auc:.6f}")
+        print(f"{'diff':>10}    : {abs(aucs['full_width'] - aucs['lean']):.2e}")
@@ -0,0 +1,185 @@
+# Content-addressed cache for pipeline stage outputs
+#
+# A stage's output is stored as <root>/<stage>/<key><ext>, where key is a
+# SHA-256 over:
+#   - the stage name and the source code of its function, plus every function
+#     of this repo it calls (code version; library code is not hashed)
+#   - its parameters (JSON, sorted keys)
+#   - the content hash of every input file
+# If the key exists the stage is skipped and the file is read back instead.
+# Outputs of upstream stages are themselves named by key, so their "content
+# hash" is just that key; raw inputs (CSVs) are hashed once and the digest is
+# remembered per (path, size, mtime) in <root>/fingerprints.json.
+#
+# The cache is bounded by max_bytes: least recently used entries (mtime is
+# bumped on every hit) are evicted after each new write, never ones used by
+# the current run.
+
+import hashlib
+import inspect
+import json
+import os
+import time
+import types
+
+HASH_BLOCK = 1 << 20
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _hash_file(path):
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _project_functions(fn, seen):
+    """fn and the module-level functions of this repo it references, transitively."""
+    if fn in seen:
+        return
+    seen[fn] = None
+    codes = [fn.__code__]
+    while codes:
+        code = codes.pop()
+        codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))  # nested defs
+        for name in code.co_names:
+            ref = fn.__globals__.get(name)
+            if isinstance(ref, types.FunctionType):
+                source_file = inspect.getsourcefile(ref) or ""
+                if os.path.abspath(source_file).startswith(PROJECT_ROOT + os.sep):
+                    _project_functions(ref, seen)
+
+
+def code_digest(fn):
+    seen = {}
+    _project_functions(fn, seen)
+    h = hashlib.sha256()
+    for f in sorted(seen, key=lambda f: (f.__module__, f.__qualname__)):
+        h.update(f"{f.__module__}.{f.__qualname__}\n".encode())
+        h.update(inspect.getsource(f).encode())
+    return h.hexdigest()
+
+
+class StageCache:
+    def __init__(self, root=".stage_cache", max_bytes=20 * 1024 ** 3, enabled=True):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.events = []  # one dict per stage run: stage, key, hit, seconds
+        self._pinned = set()
+
+        os.makedirs(self.root, exist_ok=True)
+        self._fingerprints_path = os.path.join(self.root, "fingerprints.json")
+        try:
+            with open(self._fingerprints_path) as f:
+                self._fingerprints = json.load(f)
+        except (OSError, ValueError):
+            self._fingerprints = {}
+
+    # -----------------------
+    # KEYS
+    # -----------------------
+
+    def fingerprint(self, path):
+        path = os.path.abspath(path)
+        if path.startswith(self.root + os.sep):
+            # A cached stage output: its file name already is its content address
+            return os.path.splitext(os.path.basename(path))[0]
+
+        st = os.stat(path)
+        memo_key = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+        digest = self._fingerprints.get(memo_key)
+        if digest is None:
+            digest = _hash_file(path)
+            self._fingerprints[memo_key] = digest
+            with open(self._fingerprints_path, "w") as f:
+                json.dump(self._fingerprints, f)
+        return digest
+
+    def key(self, stage, fn, inputs, params):
+        payload = {
+            "stage": stage,
+            "code": code_digest(fn),
+            "params": params,
+            "inputs": {name: self.fingerprint(path) for name, path in sorted(inputs.items())},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    # -----------------------
+    # RUN
+    # -----------------------
+
+    def run(self, stage, fn, inputs, params=None, ext=".parquet"):
+        """
+        Return the output path of fn(out_path, **inputs, **params), computing
+        it only if no output with the same key is cached.
+        """
+        params = params or {}
+        start = time.perf_counter()
+        key = self.key(stage, fn, inputs, params)
+        out_path = os.path.join(self.root, stage, key + ext)
+
+        hit = self.enabled and os.path.exists(out_path)
+        if hit:
+            os.utime(out_path)  # LRU bookkeeping
+        else:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            tmp_path = f"{out_path}.tmp-{os.getpid()}"
+            try:
+                fn(tmp_path, **inputs, **params)
+                os.replace(tmp_path, out_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        self._pinned.add(out_path)
+        seconds = time.perf_counter() - start
+        self.events.append({"stage": stage, "key": key, "hit": hit, "seconds": seconds})
+        print(f"[{stage}] cache {'hit' if hit else 'miss'} ({key[:12]}) {seconds:.2f}s")
+
+        if not hit:
+            self.evict()
+        return out_path
+
+    # -----------------------
+    # EVICTION
+    # -----------------------
+
+    def entries(self):
+        for stage in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for name in os.listdir(stage_dir):
+                if ".tmp-" in name:
+                    continue
+                path = os.path.join(stage_dir, name)
+                st = os.stat(path)
+                yield path, st.st_size, st.st_mtime
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda e: e[2])  # oldest use first
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path in self._pinned:
+                continue
+            os.remove(path)
+            total -= size
+            print(f"[stage cache] evicted {os.path.relpath(path, self.root)} ({size / 1024 ** 2:.1f} MB)")
+
+    def mlflow_tags(self):
+        """Per-stage hit/miss, key and time, for mlflow.set_tags()."""
+        tags = {}
+        for event in self.events:
+            prefix = f"stage_cache.{event['stage']}"
+            tags[prefix] = "hit" if event["hit"] else "miss"
+            tags[f"{prefix}.key"] = event["key"][:16]
+            tags[f"{prefix}.seconds"] = f"{event['seconds']:.2f}"
+        hits = sum(event["hit"] for event in self.events)
+        tags["stage_cache.hits"] = str(hits)
+        tags["stage_cache.misses"] = str(len(self.events) - hits)
+        return tags
@@ -0,0 +1,340 @@
+# Parallel hyperparameter / model-family sweep -> python -m training.sweep
+#
+#   python -m training.sweep --workers 32
+#   python -m training.sweep --grid my_grid.json
+#
+# The dataset is loaded once (training.data_loader), split once with the same
+# stratified 80/20 split as training_v1.py, and written as .npy files to a
+# scratch directory (/dev/shm when available, i.e. RAM). Worker processes open
+# them with mmap_mode="r", so every worker reads the same pages instead of
+# receiving a pickled copy of the data per task.
+#
+# The features are shared in the dtype each estimator fits on, so its input
+# validation takes the memmap as is: float64 for the linear models and
+# gradient boosting (LogisticRegression casts anything else to float64),
+# float32 for the forests. Configs with "scale": true still allocate one
+# private float64 X_train per worker (the scaled copy StandardScaler
+# produces), so size --workers for (workers x X_train float64) of RAM when the
+# grid has scaled configs; the sweep prints that estimate at start.
+#
+# Each configuration is fit in a worker; results come back to the parent,
+# which is the only process talking to MLflow. Every configuration becomes a
+# nested run under one parent run, written with a single log_batch call
+# (params + metrics + tags) instead of one request per value, so the
+# SQLite-backed tracking store sees a handful of serialized writes per config
+# rather than 32 processes contending for its lock.
+#
+# A grid file is a JSON list of {"name", "estimator", "params", "scale"}
+# entries; see DEFAULT_GRID.
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import numpy as np
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+from api.cpu import cpu_limit
+from training.data_loader import load_matrix
+from training.training_v1 import EXPERIMENT_NAME
+
+os.environ["MLFLOW_DISABLE_TELEMETRY"] = "true"
+
+# Native thread pools per worker: the sweep parallelizes across processes
+WORKER_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+ESTIMATORS = {
+    "LogisticRegression": "sklearn.linear_model",
+    "SGDClassifier": "sklearn.linear_model",
+    "RandomForestClassifier": "sklearn.ensemble",
+    "ExtraTreesClassifier": "sklearn.ensemble",
+    "HistGradientBoostingClassifier": "sklearn.ensemble",
+}
+
+
+def _logistic(name, C, penalty="l2", solver="lbfgs", scale=False, **extra):
+    params = {"C": C, "penalty": penalty, "solver": solver, "max_iter": 1000, "class_weight": "balanced"}
+    params.update(extra)
+    return {"name": name, "estimator": "LogisticRegression", "params": params, "scale": scale}
+
+
+# training_v1.py's model first, then C / penalty / solver variants and other families
+DEFAULT_GRID = (
+    [_logistic(f"lr_l2_lbfgs_C{C}", C) for C in (0.01, 0.1, 1.0, 10.0)]
+    + [_logistic(f"lr_l2_lbfgs_scaled_C{C}", C, scale=True) for C in (0.01, 0.1, 1.0, 10.0)]
+    + [_logistic(f"lr_l1_liblinear_C{C}", C, "l1", "liblinear", scale=True) for C in (0.01, 0.1, 1.0)]
+    + [_logistic(f"lr_l1_saga_C{C}", C, "l1", "saga", scale=True) for C in (0.1, 1.0)]
+    + [_logistic(f"lr_elasticnet_saga_C{C}", C, "elasticnet", "saga", scale=True, l1_ratio=0.5) for C in (0.1, 1.0)]
+    + [
+        {"name": f"sgd_log_alpha{alpha}", "estimator": "SGDClassifier", "scale": True,
+         "params": {"loss": "log_loss", "alpha": alpha, "class_weight": "balanced", "random_state": 42}}
+        for alpha in (1e-5, 1e-4, 1e-3)
+    ]
+    + [
+        {"name": "rf_200", "estimator": "RandomForestClassifier", "scale": False,
+         "params": {"n_estimators": 200, "min_samples_leaf": 5, "class_weight": "balanced_subsample",
+                    "n_jobs": 1, "random_state": 42}},
+        {"name": "extra_trees_200", "estimator": "ExtraTreesClassifier", "scale": False,
+         "params": {"n_estimators": 200, "min_samples_leaf": 5, "class_weight": "balanced",
+                    "n_jobs": 1, "random_state": 42}},
+        {"name": "hist_gb", "estimator": "HistGradientBoostingClassifier", "scale": False,
+         "params": {"max_iter": 300, "learning_rate": 0.1, "class_weight": "balanced", "random_state": 42}},
+    ]
+)
+
+
+# Trees fit/predict on float32 (anything else is copied); everything else on float64
+FLOAT32_ESTIMATORS = {"RandomForestClassifier", "ExtraTreesClassifier"}
+
+# Rows cast per chunk while writing the shared arrays
+SHARE_CHUNK_ROWS = 65536
+
+
+def input_dtype(config):
+    return "float32" if config["estimator"] in FLOAT32_ESTIMATORS else "float64"
+
+
+# -----------------------
+# SHARED DATA (parent writes, workers memory-map)
+# -----------------------
+
+def scratch_dir():
+    # /dev/shm is tmpfs: the "files" are shared memory pages
+    return tempfile.mkdtemp(prefix="fraud-sweep-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+
+def _write_rows(path, source, rows, dtype):
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(len(rows),) + source.shape[1:])
+    for k in range(0, len(rows), SHARE_CHUNK_ROWS):
+        # Gather + cast one chunk at a time: no full-size temporary
+        out[k:k + SHARE_CHUNK_ROWS] = source[rows[k:k + SHARE_CHUNK_ROWS]]
+    out.flush()
+    nbytes = out.nbytes
+    del out
+    return nbytes
+
+
+def share_split(path, out_dir, dtypes, test_size=0.2, seed=42):
+    """
+    Load + split once; each split is written contiguously (C order), once per
+    feature dtype in `dtypes`, so workers never fancy-index or cast a copy.
+    Returns (feature_columns, report, {array name: bytes}).
+    """
+    from sklearn.model_selection import train_test_split
+
+    X, y, feature_columns, _, report = load_matrix(path)
+    train_rows, test_rows = train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=seed, stratify=y
+    )
+    report["train_rows"] = len(train_rows)
+    sizes = {}
+    for split, rows in (("train", train_rows), ("test", test_rows)):
+        sizes[f"y_{split}"] = _write_rows(os.path.join(out_dir, f"y_{split}.npy"), y, rows, y.dtype)
+        for dtype in dtypes:
+            name = f"X_{split}_{dtype}"
+            sizes[name] = _write_rows(os.path.join(out_dir, f"{name}.npy"), X, rows, dtype)
+    del X, y
+    return feature_columns, report, sizes
+
+
+_data = {}
+
+
+def _init_worker(data_dir):
+    for file_name in os.listdir(data_dir):
+        name, ext = os.path.splitext(file_name)
+        if ext == ".npy":
+            _data[name] = np.load(os.path.join(data_dir, file_name), mmap_mode="r")
+
+
+# -----------------------
+# WORKER
+# -----------------------
+
+def build_estimator(config):
+    import importlib
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    module = ESTIMATORS.get(config["estimator"])
+    if module is None:
+        raise ValueError(f"Unknown estimator {config['estimator']!r} (known: {sorted(ESTIMATORS)})")
+    estimator = getattr(importlib.import_module(module), config["estimator"])(**config.get("params", {}))
+    return make_pipeline(StandardScaler(), estimator) if config.get("scale") else estimator
+
+
+def fit_config(config):
+    """Runs in a worker. Never raises: a failed config comes back with its traceback."""
+    from sklearn.metrics import average_precision_score, roc_auc_score
+
+    result = {"config": config, "pid": os.getpid(), "metrics": {}, "error": None}
+    try:
+        model = build_estimator(config)
+        dtype = input_dtype(config)
+        start = time.perf_counter()
+        model.fit(_data[f"X_train_{dtype}"], _data["y_train"])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        probs = model.predict_proba(_data[f"X_test_{dtype}"])[:, 1]
+        predict_seconds = time.perf_counter() - start
+
+        y_test = _data["y_test"]
+        result["metrics"] = {
+            "roc_auc": roc_auc_score(y_test, probs),
+            "average_precision": average_precision_score(y_test, probs),
+            "fit_seconds": fit_seconds,
+            "predict_seconds": predict_seconds,
+        }
+        n_iter = getattr(model[-1] if config.get("scale") else model, "n_iter_", None)
+        if n_iter is not None:
+            result["metrics"]["n_iter"] = float(np.max(n_iter))
+    except Exception:
+        result["error"] = traceback.format_exc()
+    return result
+
+
+# -----------------------
+# MLFLOW (parent only)
+# -----------------------
+
+def log_child_run(client, experiment_id, parent_run_id, result):
+    """One nested run = create_run + one log_batch + set_terminated."""
+    config = result["config"]
+    run = client.create_run(
+        experiment_id,
+        tags={MLFLOW_PARENT_RUN_ID: parent_run_id},
+        run_name=config["name"],
+    )
+    now = int(time.time() * 1000)
+    params = {"model_type": config["estimator"], "scale": config.get("scale", False)}
+    params.update(config.get("params", {}))
+    tags = {"sweep.worker_pid": result["pid"]}
+    if result["error"]:
+        # Last line of the traceback (tags are length-limited)
+        tags["sweep.error"] = result["error"].strip().splitlines()[-1][:500]
+
+    client.log_batch(
+        run.info.run_id,
+        metrics=[Metric(key, float(value), now, 0) for key, value in result["metrics"].items()],
+        params=[Param(key, str(value)) for key, value in params.items()],
+        tags=[RunTag(key, str(value)) for key, value in tags.items()],
+    )
+    client.set_terminated(run.info.run_id, status="FAILED" if result["error"] else "FINISHED")
+    return run.info.run_id
+
+
+def load_grid(path):
+    if not path:
+        return DEFAULT_GRID
+    with open(path) as f:
+        grid = json.load(f)
+    names = [config["name"] for config in grid]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: duplicate config names")
+    return grid
+
+
+def run_sweep(data, grid, workers):
+    data_dir = scratch_dir()
+    try:
+        start = time.perf_counter()
+        dtypes = sorted({input_dtype(config) for config in grid})
+        feature_columns, report, sizes = share_split(data, data_dir, dtypes)
+        load_seconds = time.perf_counter() - start
+        shared_mb = sum(sizes.values()) / 1024 ** 2
+        print(f"Data shared via {data_dir} ({shared_mb:.0f} MB, {', '.join(dtypes)}) in {load_seconds:.1f}s")
+
+        if any(config.get("scale") for config in grid):
+            # StandardScaler's output is a private float64 X_train in each worker
+            scaled_mb = report["train_rows"] * len(feature_columns) * 8 / 1024 ** 2
+            print(f"Scaled configs: ~{scaled_mb:.0f} MB private per worker "
+                  f"(~{scaled_mb * workers / 1024:.1f} GB across {workers} workers)")
+
+        # Set before the (spawned) workers start so BLAS/OpenMP read them at import
+        for var in WORKER_THREAD_VARS:
+            os.environ.setdefault(var, "1")
+
+        client = MlflowClient()
+        parent = mlflow.active_run()
+        experiment_id = parent.info.experiment_id
+        mlflow.log_params({
+            "sweep_configs": len(grid),
+            "sweep_workers": workers,
+            "num_features": len(feature_columns),
+        })
+        mlflow.log_metric("data_memory_mb", report["lean_mb"])
+        mlflow.log_metric("shared_memory_mb", shared_mb)
+
+        results = []
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp.get_context("spawn"),
+            initializer=_init_worker, initargs=(data_dir,)
+        ) as pool:
+            futures = [pool.submit(fit_config, config) for config in grid]
+            for future in as_completed(futures):
+                result = future.result()
+                result["run_id"] = log_child_run(client, experiment_id, parent.info.run_id, result)
+                results.append(result)
+                auc = result["metrics"].get("roc_auc")
+                status = f"AUC {auc:.4f}" if auc is not None else "FAILED"
+                print(f"[{len(results)}/{len(grid)}] {result['config']['name']}: {status}")
+        sweep_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return results, load_seconds, sweep_seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel fraud model sweep")
+    parser.add_argument("--data", default="spark/processed_train.parquet")
+    parser.add_argument("--grid", default="", help="JSON list of configs (default: built-in grid)")
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="0 = CPUs available to this container; scaled configs need ~one float64 X_train of RAM per worker"
+    )
+    args = parser.parse_args()
+
+    grid = load_grid(args.grid)
+    workers = args.workers or max(1, int(cpu_limit()))
+    workers = min(workers, len(grid))
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+
+    with mlflow.start_run(run_name="sweep"):
+        results, load_seconds, sweep_seconds = run_sweep(args.data, grid, workers)
+
+        ok = [r for r in results if not r["error"]]
+        serial_seconds = sum(r["metrics"]["fit_seconds"] + r["metrics"]["predict_seconds"] for r in ok)
+        mlflow.log_metrics({
+            "load_seconds": load_seconds,
+            "sweep_seconds": sweep_seconds,
+            "serial_fit_seconds": serial_seconds,
+            "failed_configs": len(results) - len(ok),
+        })
+        mlflow.log_dict(
+            {r["config"]["name"]: {"run_id": r["run_id"], **r["metrics"], "error": r["error"]} for r in results},
+            "sweep_results.json"
+        )
+
+        print("=" * 60)
+        for r in sorted(ok, key=lambda r: -r["metrics"]["roc_auc"]):
+            print(f"{r['config']['name']:>32}: AUC {r['metrics']['roc_auc']:.4f} ({r['metrics']['fit_seconds']:.1f}s)")
+        if ok:
+            best = max(ok, key=lambda r: r["metrics"]["roc_auc"])
+            mlflow.log_metric("best_roc_auc", best["metrics"]["roc_auc"])
+            mlflow.set_tags({"sweep.best_config": best["config"]["name"], "sweep.best_run_id": best["run_id"]})
+            print(f"Best: {best['config']['name']} (AUC {best['metrics']['roc_auc']:.4f})")
+        print(f"Sweep wall time {sweep_seconds:.0f}s vs {serial_seconds:.0f}s of fit+predict across {workers} workers")
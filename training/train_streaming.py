@@ -0,0 +1,173 @@
+# Out-of-core training -> python -m training.train_streaming --epochs 5
+#
+# Same data and label as training_v1.py, but the Parquet file is never loaded
+# whole: it is read one row group at a time as a float32 matrix, and an
+# SGDClassifier (log loss, i.e. logistic regression) is fit with partial_fit
+# over several epochs. Peak memory is bounded by the largest row group.
+#
+# Passes over the file:
+#   1. stats  -> class counts (for "balanced" class weights) and feature
+#                mean/std (StandardScaler.partial_fit) on training rows only
+#   2. train  -> `epochs` passes of partial_fit, row groups and rows shuffled
+#   3. eval   -> test-split probabilities for the AUC
+#
+# Train/test split is a hash of TransactionID (or of the row number if the
+# column is missing), so every pass and every run puts each row on the same
+# side without ever holding the full dataset.
+
+import argparse
+import os
+import resource
+import time
+
+import numpy as np
+import pyarrow.parquet as pq
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import mlflow
+import mlflow.sklearn
+
+from training.data_loader import LABEL, feature_columns_of, iter_row_groups
+from training.training_v1 import EXPERIMENT_NAME
+
+os.environ["MLFLOW_DISABLE_TELEMETRY"] = "true"
+
+SPLIT_KEY = "TransactionID"
+
+
+# -----------------------
+# DATA
+# -----------------------
+
+def hashed_test_mask(keys, test_percent, seed=42):
+    """Deterministic per-row split: splitmix64 hash of the key, bucketed 0..99."""
+    x = keys.astype(np.uint64) + np.uint64(seed)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x % np.uint64(100)) < np.uint64(test_percent)
+
+
+def iter_split_groups(pf, feature_columns, order=None):
+    """Yield (X float32, y, split keys) one row group at a time."""
+    has_key = SPLIT_KEY in pf.schema_arrow.names
+    offsets = np.cumsum([0] + [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)])
+    groups = order if order is not None else range(pf.num_row_groups)
+    extra = [SPLIT_KEY] if has_key else []
+
+    for i, (X, y, extras) in zip(groups, iter_row_groups(pf, feature_columns, LABEL, extra, groups)):
+        keys = extras[SPLIT_KEY] if has_key else np.arange(offsets[i], offsets[i + 1])
+        yield X, y, keys
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# -----------------------
+# TRAINING
+# -----------------------
+
+def train(path, epochs=5, test_percent=20, alpha=1e-4, batch_size=65536, seed=42):
+    pf = pq.ParquetFile(path)
+    feature_columns = feature_columns_of(pf)
+    rng = np.random.default_rng(seed)
+
+    # Pass 1: class counts + standardization stats on the training split
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    counts = np.zeros(2, dtype=np.int64)
+    n_test = 0
+    for X, y, keys in iter_split_groups(pf, feature_columns):
+        train_rows = ~hashed_test_mask(keys, test_percent, seed)
+        n_test += int((~train_rows).sum())
+        if train_rows.any():
+            scaler.partial_fit(X[train_rows])
+            counts += np.bincount(y[train_rows], minlength=2)
+    n_train = int(counts.sum())
+    stats_seconds = time.perf_counter() - start
+
+    # Same weights as class_weight="balanced" in training_v1.py (not supported by partial_fit)
+    class_weight = {c: n_train / (2 * counts[c]) for c in (0, 1)}
+    clf = SGDClassifier(loss="log_loss", alpha=alpha, class_weight=class_weight, random_state=seed)
+    classes = np.array([0, 1])
+
+    # Pass 2: epochs of partial_fit, shuffled at row-group and row level
+    train_seconds = 0.0
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        for X, y, keys in iter_split_groups(pf, feature_columns, order=rng.permutation(pf.num_row_groups)):
+            train_rows = np.flatnonzero(~hashed_test_mask(keys, test_percent, seed))
+            rng.shuffle(train_rows)
+            for k in range(0, len(train_rows), batch_size):
+                rows = train_rows[k:k + batch_size]
+                clf.partial_fit(scaler.transform(X[rows]), y[rows], classes=classes)
+        epoch_seconds = time.perf_counter() - start
+        train_seconds += epoch_seconds
+        mlflow.log_metric("epoch_rows_per_sec", n_train / epoch_seconds, step=epoch)
+        print(f"Epoch {epoch + 1}/{epochs}: {n_train / epoch_seconds:,.0f} rows/s")
+
+    # Pass 3: test-split scores (two small vectors, not the test matrix)
+    model = make_pipeline(scaler, clf)
+    # Fitted on arrays, so record the column order the API reads from feature_names_in_
+    scaler.feature_names_in_ = np.asarray(feature_columns, dtype=object)
+    scores, labels = [], []
+    for X, y, keys in iter_split_groups(pf, feature_columns):
+        test_rows = hashed_test_mask(keys, test_percent, seed)
+        if test_rows.any():
+            scores.append(model.predict_proba(X[test_rows])[:, 1].astype(np.float32))
+            labels.append(y[test_rows])
+    auc = roc_auc_score(np.concatenate(labels), np.concatenate(scores))
+
+    stats = {
+        "n_train": n_train,
+        "n_test": n_test,
+        "n_features": len(feature_columns),
+        "row_groups": pf.num_row_groups,
+        "stats_seconds": stats_seconds,
+        "train_seconds": train_seconds,
+    }
+    return model, auc, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core fraud model training")
+    parser.add_argument("--data", default="spark/processed_train.parquet")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--test-percent", type=int, default=20)
+    parser.add_argument("--alpha", type=float, default=1e-4)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+
+    with mlflow.start_run(run_name="sgd_logistic_streaming"):
+        mlflow.log_param("model_type", "SGDClassifier")
+        mlflow.log_param("loss", "log_loss")
+        mlflow.log_param("alpha", args.alpha)
+        mlflow.log_param("epochs", args.epochs)
+        mlflow.log_param("batch_size", args.batch_size)
+        mlflow.log_param("test_percent", args.test_percent)
+        mlflow.log_param("class_weight", "balanced")
+
+        model, auc, stats = train(
+            args.data, args.epochs, args.test_percent, args.alpha, args.batch_size, args.seed
+        )
+
+        mlflow.log_param("num_features", stats["n_features"])
+        mlflow.log_param("row_groups", stats["row_groups"])
+        mlflow.log_metric("roc_auc", auc)
+        mlflow.log_metric("train_rows", stats["n_train"])
+        mlflow.log_metric("test_rows", stats["n_test"])
+        mlflow.log_metric("train_rows_per_sec", stats["n_train"] * args.epochs / stats["train_seconds"])
+        mlflow.log_metric("stats_pass_seconds", stats["stats_seconds"])
+        mlflow.log_metric("peak_rss_mb", peak_rss_mb())
+
+        mlflow.sklearn.log_model(model, name="model")
+
+        print(f"Streaming model AUC: {auc:.4f} | peak RSS {peak_rss_mb():.0f} MB")
@@ -8,11 +8,122 @@ import mlflow
 import mlflow.sklearn
 
 import os	
+import json
+import sys
+import tracemalloc
+import numpy as np
+
+# `python training/training_v1.py` puts training/ (not the repo root) on sys.path;
+# add the root so the shared training.* modules import either way
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from training.data_loader import full_width_auc, load_matrix
+
 # Disable MLflow usage tracking
 os.environ["MLFLOW_DISABLE_TELEMETRY"] = "true"
 
 EXPERIMENT_NAME = "fraud_detection_v1" 
 
+# Local copy of the compact serving artifact (also logged to MLflow under "serving/")
+SERVING_ARTIFACT_DIR = "serving_model"
+# Same bound the API holds the ONNX backend to (api/scoring.py)
+ONNX_PARITY_ATOL = 1e-6
+
+
+def export_serving_artifact(model, feature_columns, model_version, out_dir):
+    """
+    Write a compact, memory-mappable serving artifact for linear models:
+        coef.npy / intercept.npy  -> float64 arrays (np.load(..., mmap_mode="r"))
+        meta.json                 -> feature names, model version, model type
+    The API loads this directly instead of unpickling through mlflow.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    coef = np.ascontiguousarray(model.coef_, dtype=np.float64).reshape(-1)
+    intercept = np.asarray(model.intercept_, dtype=np.float64).reshape(-1)
+    np.save(os.path.join(out_dir, "coef.npy"), coef)
+    np.save(os.path.join(out_dir, "intercept.npy"), intercept)
+
+    meta = {
+        "format_version": 1,
+        "model_type": type(model).__name__,
+        "model_version": model_version,
+        "feature_columns": list(feature_columns),
+        "classes": [int(c) for c in model.classes_]
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    return out_dir
+
+
+def export_onnx_model(model, X_test, out_dir, atol=ONNX_PARITY_ATOL):
+    """
+    Convert the fitted model to <out_dir>/model.onnx (float64 input, plain
+    probability tensor output) and check it against predict_proba on the test
+    split. Returns the max absolute difference; raises if it exceeds atol.
+    """
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import DoubleTensorType
+    import onnxruntime as ort
+
+    os.makedirs(out_dir, exist_ok=True)
+    onx = convert_sklearn(
+        model,
+        initial_types=[("input", DoubleTensorType([None, X_test.shape[1]]))],
+        options={id(model): {"zipmap": False}}
+    )
+    path = os.path.join(out_dir, "model.onnx")
+    with open(path, "wb") as f:
+        f.write(onx.SerializeToString())
+
+    values = X_test.to_numpy(dtype=np.float64)
+    session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    onnx_probs = session.run(["probabilities"], {"input": values})[0][:, 1]
+    max_diff = float(np.max(np.abs(onnx_probs - model.predict_proba(X_test)[:, 1])))
+    if max_diff > atol:
+        os.remove(path)
+        raise RuntimeError(f"ONNX parity check failed: max |diff| {max_diff:.2e} > {atol:.0e}")
+
+    return max_diff
+
+
+def export_drift_baseline(X, out_dir, n_bins=10):
+    """
+    Per-feature training distribution for the API's online drift monitor
+    (api/drift.py), written to <out_dir>/drift_baseline.json:
+        inner_edges  -> n_bins - 1 quantile cut points per feature
+        proportions  -> share of training rows in each of the n_bins bins
+        mean / std / zero_rate
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    values = X.to_numpy(dtype=np.float64)
+
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    inner_edges = np.quantile(values, quantiles, axis=0).T  # (n_features, n_bins - 1)
+
+    # Same rule as the API: bin = number of inner edges strictly below the value
+    proportions = np.empty((values.shape[1], n_bins))
+    for j in range(values.shape[1]):
+        bins = np.searchsorted(inner_edges[j], values[:, j], side="left")
+        proportions[j] = np.bincount(bins, minlength=n_bins) / len(values)
+
+    baseline = {
+        "format_version": 1,
+        "feature_columns": list(X.columns),
+        "n_rows": int(len(values)),
+        "inner_edges": inner_edges.tolist(),
+        "proportions": proportions.tolist(),
+        "mean": values.mean(axis=0).tolist(),
+        "std": values.std(axis=0, ddof=1).tolist(),
+        "zero_rate": (values == 0).mean(axis=0).tolist()
+    }
+    path = os.path.join(out_dir, "drift_baseline.json")
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+
+    return path
 
 
 if __name__ == "__main__":
@@ -21,11 +132,20 @@ if __name__ == "__main__":
     
     with mlflow.start_run(run_name='logistc_regression_v1'):
         # load the data
-        df = pd.read_parquet("spark/processed_train.parquet")
-        print('Data loaded for training.')
+        # Lean load: float32 matrix + int8 label, no full-width DataFrame copies.
+        # numpy allocations show up in tracemalloc, so the peaks below are real
+        data_path = "spark/processed_train.parquet"
+        tracemalloc.start()
+        values, y, feature_columns, schema, report = load_matrix(data_path)
+        load_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        print(f"Data loaded for training ({report['lean_mb']:.0f} MB, saved {report['saved_mb']:.0f} MB, "
+              f"peak {load_peak_mb:.0f} MB).")
+        mlflow.log_metric("data_memory_mb", report["lean_mb"])
+        mlflow.log_metric("load_peak_mb", load_peak_mb)
+        mlflow.log_dict(schema, "data_schema.json")
 
-        X = df.drop(columns=["isFraud"])
-        y = df["isFraud"]
+        # Named columns (no copy) so the model keeps feature_names_in_ for the API
+        X = pd.DataFrame(values, columns=feature_columns, copy=False)
         
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
@@ -44,9 +164,16 @@ if __name__ == "__main__":
         mlflow.log_param("num_features", X_train.shape[1])
     
         # Train	
+        # lbfgs only runs in float64: fit() makes a float64 copy of X_train, so
+        # the fit peak is that copy on top of the float32 data. The lean load
+        # saves memory while loading and holding the data, not during the fit.
+        tracemalloc.reset_peak()
         model.fit(X_train, y_train)
+        fit_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
 
-        print('Model trained.')
+        print(f'Model trained (peak {fit_peak_mb:.0f} MB while fitting).')
+        mlflow.log_metric("fit_peak_mb", fit_peak_mb)
         preds = model.predict_proba(X_test)[:, 1]
         auc = roc_auc_score(y_test, preds)
 
@@ -59,4 +186,25 @@ if __name__ == "__main__":
             name='model'
         )
 
+        # compact serving artifact for fast API cold start
+        run_id = mlflow.active_run().info.run_id
+        export_serving_artifact(model, X_train.columns, run_id, SERVING_ARTIFACT_DIR)
+        # training-distribution baseline for online drift scores
+        export_drift_baseline(X_train, SERVING_ARTIFACT_DIR)
+
+        # ONNX graph for the onnxruntime backend (SCORING_BACKEND=onnx)
+        onnx_diff = export_onnx_model(model, X_test, SERVING_ARTIFACT_DIR)
+        mlflow.log_metric("onnx_max_abs_diff", onnx_diff)
+        print(f"ONNX export parity on test split: max |diff| {onnx_diff:.2e}")
+        mlflow.log_artifacts(SERVING_ARTIFACT_DIR, artifact_path="serving")
+        print(f"Serving artifact written to {SERVING_ARTIFACT_DIR}/")
+
         print(f"V1 Model AUC: {auc:.4f}")
+
+        # Reference: same model and split on the full-width (int64/float64) read,
+        # so the float32 AUC can be checked against it in the same run
+        del values, X, X_train, X_test
+        reference_auc = full_width_auc(data_path, feature_columns)
+        mlflow.log_metric("roc_auc_full_width", reference_auc)
+        mlflow.log_metric("roc_auc_float32_diff", abs(auc - reference_auc))
+        print(f"Full-width AUC: {reference_auc:.4f} (diff {abs(auc - reference_auc):.2e})")